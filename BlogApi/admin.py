@@ -1,4 +1,9 @@
+import os
+
 from django.contrib import admin
+
+from Images.jobs import enqueue_conversion
+from Images.pipeline import store_image
 from .models import Author, Category, Tag, Post, Comment
 
 
@@ -34,7 +39,8 @@ class TagAdmin(admin.ModelAdmin):
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'category', 'published_at', 'featured')
+    list_display = ('title', 'author', 'category', 'published_at', 'featured',
+                    'public_comment_count')
     list_filter = ('featured', 'category', 'published_at', 'tags')
     search_fields = ('title', 'excerpt', 'content')
     prepopulated_fields = {'slug': ('title',)}
@@ -44,6 +50,20 @@ class PostAdmin(admin.ModelAdmin):
     inlines = [CommentInline]
     readonly_fields = ("image_tag",)
 
+    def save_model(self, request, obj, form, change):
+        queued = False
+        if 'image' in form.changed_data and obj.image:
+            old_obj = None
+            if change:
+                old_obj = self.model.objects.filter(pk=obj.pk).first()
+
+            base, ext = os.path.splitext(os.path.basename(obj.image.name))
+            queued = store_image(obj, obj.title or base, previous=old_obj)
+
+        super().save_model(request, obj, form, change)
+        if queued:
+            enqueue_conversion(obj)
+
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
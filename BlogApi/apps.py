@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BlogapiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'BlogApi'
+
+    def ready(self):
+        from BlogApi import signals  # noqa: F401
@@ -0,0 +1,79 @@
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from BlogApi.models import Author, Category, Post, Tag
+from BlogApi.untils import TAGS_ALL, TAGS_ANY, filter_by_tags
+
+
+def chained_tag_filter(posts, slugs):
+    # The previous strategy: one extra join per requested tag.
+    for slug in slugs:
+        posts = posts.filter(tags__slug=slug)
+    return posts
+
+
+class Command(BaseCommand):
+    help = ("Benchmark multi-tag post filtering at 1, 5 and 10 tags over a "
+            "seeded dataset. All seeded rows are rolled back afterwards.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--tags', type=int, default=30)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def seed(self, posts, tags, rng):
+        # Unique per run, so seeding never collides with existing rows.
+        run = f"bench-{uuid.uuid4().hex[:8]}"
+        author = Author.objects.create(name="Bench", email=f"{run}@example.com")
+        category = Category.objects.create(title=run, slug=run)
+        tag_objs = Tag.objects.bulk_create(
+            Tag(name=f"{run} {i}", slug=f"{run}-{i}") for i in range(tags))
+        now = timezone.now()
+        post_objs = Post.objects.bulk_create(
+            (Post(title=f"{run} {i}", slug=f"{run}-{i}", excerpt="", content="",
+                  category=category, author=author, published_at=now)
+             for i in range(posts)), batch_size=1000)
+        Through = Post.tags.through
+        Through.objects.bulk_create(
+            (Through(post_id=post.pk, tag_id=tag.pk)
+             for post in post_objs
+             for tag in rng.sample(tag_objs, rng.randint(5, min(15, tags)))),
+            batch_size=5000)
+        return [tag.slug for tag in tag_objs]
+
+    def time_query(self, queryset, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = len(list(queryset.values_list('pk', flat=True)))
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, rows
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        strategies = (
+            ('chained joins', lambda qs, slugs: chained_tag_filter(qs, slugs)),
+            ('grouped all-of', lambda qs, slugs: filter_by_tags(qs, slugs, TAGS_ALL)),
+            ('any-of', lambda qs, slugs: filter_by_tags(qs, slugs, TAGS_ANY)),
+        )
+
+        with transaction.atomic():
+            self.stdout.write(f"Seeding {options['posts']} posts and {options['tags']} tags...")
+            slugs = self.seed(options['posts'], options['tags'], rng)
+
+            self.stdout.write(f"{'tags':>5}  {'strategy':<15} {'best ms':>9} {'rows':>7}")
+            for count in (1, 5, 10):
+                chosen = rng.sample(slugs, min(count, len(slugs)))
+                for name, strategy in strategies:
+                    elapsed, rows = self.time_query(
+                        strategy(Post.objects.all(), chosen), options['repeat'])
+                    self.stdout.write(f"{count:>5}  {name:<15} {elapsed * 1000:9.2f} {rows:>7}")
+
+            transaction.set_rollback(True)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from BlogApi.models import Post
+
+
+class Command(BaseCommand):
+    help = "Recompute Post.search_vector for every post (PostgreSQL only)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help="Database alias to rebuild the index on.")
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if connections[using].vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(
+                "Full-text search needs PostgreSQL; the title search fallback "
+                "has no index to rebuild."))
+            return
+
+        updated = Post.objects.using(using).update(
+            search_vector=Post.search_vector_expression())
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt the search vector for {updated} posts."))
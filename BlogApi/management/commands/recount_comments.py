@@ -0,0 +1,33 @@
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from BlogApi.models import Comment, Post
+from api.cache import bump_model_version
+
+
+class Command(BaseCommand):
+    help = "Recompute Post.public_comment_count for every post in one UPDATE."
+
+    def handle(self, *args, **options):
+        public_comments = (Comment.objects
+                           .filter(post=OuterRef('pk'), is_public=True)
+                           .order_by()
+                           .values('post')
+                           .annotate(total=Count('pk'))
+                           .values('total'))
+
+        with transaction.atomic():
+            updated = Post.objects.update(public_comment_count=Coalesce(
+                Subquery(public_comments, output_field=IntegerField()),
+                Value(0),
+            ))
+            # QuerySet.update() sends no signals: drop the cached listings
+            # showing the old counts once the new ones are committed.
+            transaction.on_commit(partial(bump_model_version, Post))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Recounted public comments for {updated} posts."))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 00:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BlogApi', '0004_alter_post_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-published_at', '-id'], name='blogapi_post_pub_id_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-18 00:40
+
+from django.db import migrations, models
+
+
+def count_public_comments(apps, schema_editor):
+    Post = apps.get_model('BlogApi', 'Post')
+    for post in Post.objects.all().iterator():
+        post.public_comment_count = post.comments.filter(is_public=True).count()
+        post.save(update_fields=['public_comment_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BlogApi', '0005_post_published_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='public_comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of public comments, kept in sync by Comment signals.'),
+        ),
+        migrations.RunPython(count_public_comments, migrations.RunPython.noop),
+    ]
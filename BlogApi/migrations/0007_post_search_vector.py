@@ -0,0 +1,47 @@
+# Generated by Django 5.2.1 on 2026-10-18 00:45
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+INDEX_NAME = 'blogapi_post_search_vector_gin'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Post = apps.get_model('BlogApi', 'Post')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} '
+        f'ON {schema_editor.quote_name(Post._meta.db_table)} USING gin (search_vector)'
+    )
+    config = settings.POST_SEARCH_CONFIG
+    Post.objects.using(schema_editor.connection.alias).update(search_vector=(
+        SearchVector('title', weight='A', config=config) +
+        SearchVector('excerpt', weight='B', config=config) +
+        SearchVector('content', weight='C', config=config)
+    ))
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BlogApi', '0006_post_public_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Weighted title/excerpt/content vector, PostgreSQL only.', null=True),
+        ),
+        # GIN indexes only exist on PostgreSQL, so the index is created here
+        # instead of in Post.Meta.indexes to keep SQLite migrations working.
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
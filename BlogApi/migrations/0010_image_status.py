@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BlogApi', '0009_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_status',
+            field=models.CharField(choices=[('pending', 'Waiting for conversion'), ('ready', 'Ready'), ('failed', 'Conversion failed')], default='ready', editable=False, max_length=10),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 01:24
+
+import Images.pipeline
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BlogApi', '0010_image_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='posts/images/', validators=[Images.pipeline.validate_image_upload]),
+        ),
+    ]
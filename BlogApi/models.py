@@ -1,8 +1,12 @@
+from django.conf import settings
 from django.contrib import admin
-from django.db import models
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import connections, models, router, transaction
 from django.utils.html import format_html
 from django.utils.text import slugify
 
+from Images.pipeline import ImageStatus, preview_url, srcset, validate_image_upload
+
 class Author(models.Model):
     """
     Represents an author of a post.
@@ -18,6 +22,7 @@ class Author(models.Model):
         blank=True,
         help_text="Optional profile picture for the author"
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     @admin.display
     def image_tag(self):
@@ -38,6 +43,7 @@ class Category(models.Model):
     """
     title = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(max_length=60, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = "Categories"
@@ -58,6 +64,7 @@ class Tag(models.Model):
     """
     name = models.CharField(max_length=30, unique=True)
     slug = models.SlugField(max_length=40, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -96,7 +103,11 @@ class Post(models.Model):
     )
     image = models.ImageField(
         upload_to='posts/images/',
-        null=True, blank=True,)
+        null=True, blank=True,
+        validators=[validate_image_upload])
+    image_variants = models.JSONField(default=list, blank=True, editable=False)
+    image_status = models.CharField(max_length=10, choices=ImageStatus.choices,
+                                    default=ImageStatus.READY, editable=False)
     category = models.ForeignKey(
         Category,
         on_delete=models.PROTECT,
@@ -129,11 +140,27 @@ class Post(models.Model):
         blank=True
     )
     content = models.TextField(help_text="Full HTML or Markdown content of the post.")
+    public_comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of public comments, kept in sync by Comment signals."
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Weighted title/excerpt/content vector, PostgreSQL only."
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Maintained by Comment signals and update_search_vector(), never by save().
+    DERIVED_FIELDS = ('public_comment_count', 'search_vector')
 
     class Meta:
         ordering = ["-published_at"]
         indexes = [
             models.Index(fields=["published_at"]),
+            models.Index(fields=["-published_at", "-id"],
+                         name="blogapi_post_pub_id_idx"),
             models.Index(fields=["slug"]),
         ]
 
@@ -143,11 +170,15 @@ class Post(models.Model):
     @admin.display
     def image_tag(self):
         return format_html('<img src="{}" height="100" />',
-                           self.image.url)
+                           preview_url(self.image, self.image_variants))
 
     image_tag.short_description = 'Image'
     image_tag.allow_tags = True
 
+    @property
+    def image_srcset(self):
+        return srcset(self.image, self.image_variants)
+
     @property
     def comment_count(self):
         # Instead of storing commentCount redundantly, compute it on the fly.
@@ -157,8 +188,42 @@ class Post(models.Model):
         # Auto-generate slug from title if not provided
         if not self.slug:
             self.slug = slugify(self.title)
+        if (not self._state.adding and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert')):
+            # Write everything but the columns kept up to date by their own
+            # UPDATEs, so e.g. an admin save does not put back the comment
+            # count it loaded before a comment arrived.
+            skipped = set(self.DERIVED_FIELDS) | self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
         super().save(*args, **kwargs)
 
+        # On PostgreSQL this is a second UPDATE per save that writes text:
+        # the vector is computed from the stored columns, which an INSERT
+        # cannot reference, and edits take the same path. Saves limited to
+        # other update_fields skip it.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'title', 'excerpt', 'content'} & set(update_fields):
+            self.update_search_vector()
+
+    @staticmethod
+    def search_vector_expression():
+        """
+        Search document for a post: title weighs most, then excerpt, then content.
+        """
+        config = settings.POST_SEARCH_CONFIG
+        return (SearchVector('title', weight='A', config=config) +
+                SearchVector('excerpt', weight='B', config=config) +
+                SearchVector('content', weight='C', config=config))
+
+    def update_search_vector(self):
+        using = self._state.db or router.db_for_write(Post, instance=self)
+        if connections[using].vendor == 'postgresql':
+            Post.objects.using(using).filter(pk=self.pk).update(
+                search_vector=self.search_vector_expression())
+
 
 class Comment(models.Model):
     """
@@ -179,9 +244,20 @@ class Comment(models.Model):
         default=True,
         help_text="Uncheck to hide comment without deleting."
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["created_at"]
 
     def __str__(self):
         return f"Comment by {self.name} on {self.post.title}"
+
+    def save(self, *args, **kwargs):
+        # Keep the Post.public_comment_count update from the signal handlers
+        # in the same transaction as the comment write.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
@@ -0,0 +1,64 @@
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from BlogApi.models import Category, Comment, Post
+from BlogApi.untils import CATEGORY_COUNTS_CACHE_KEY
+
+
+def _shift_comment_count(post_id, delta):
+    if post_id is None or delta == 0:
+        return
+    Post.objects.filter(pk=post_id).update(
+        public_comment_count=Greatest(F('public_comment_count') + delta, 0)
+    )
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_state(sender, instance, using, raw=False, **kwargs):
+    """
+    Remember which post the comment was counted against before the write,
+    so post_save can apply only the difference. The row stays locked until
+    Comment.save() commits, so a concurrent save of the same comment cannot
+    apply the same difference again.
+    """
+    instance._counted_post_id = None
+    if raw or instance.pk is None:
+        return
+    previous = (Comment.objects.using(using).select_for_update()
+                .filter(pk=instance.pk).values('post_id', 'is_public').first())
+    if previous and previous['is_public']:
+        instance._counted_post_id = previous['post_id']
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous_post_id = getattr(instance, '_counted_post_id', None)
+    current_post_id = instance.post_id if instance.is_public else None
+    if previous_post_id == current_post_id:
+        return
+    _shift_comment_count(previous_post_id, -1)
+    _shift_comment_count(current_post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def update_comment_count_on_delete(sender, instance, **kwargs):
+    if instance.is_public:
+        _shift_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_post_counts(sender, using, **kwargs):
+    # After commit: a request reading the old rows before then would cache
+    # them again.
+    transaction.on_commit(partial(cache.delete, CATEGORY_COUNTS_CACHE_KEY), using=using)
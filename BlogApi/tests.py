@@ -1,10 +1,18 @@
 # tests/test_models.py
 import json
+import time
+from io import StringIO
+from unittest import skipIf, skipUnless
 from unittest.mock import patch
 
 import fakeredis
+from asgiref.sync import sync_to_async
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase, APIRequestFactory
 from django.urls import reverse
@@ -13,7 +21,11 @@ from django.utils.text import slugify
 from datetime import timedelta, datetime
 
 from BlogApi.models import Author, Category, Tag, Post, Comment
+from BlogApi.untils import CATEGORY_COUNTS_CACHE_KEY, search_posts
+from BlogApi.views import AsyncPostViewsEndpoint, PostViewsEndpoint
 from Images.models import Image
+from Images.tests import TemporaryMediaMixin
+from api.cache import get_model_versions
 
 
 class AuthorModelTests(TestCase):
@@ -266,8 +278,66 @@ class CommentModelTests(TestCase):
         self.assertEqual(comment.content, "Hello world!")
         self.assertEqual(comment.post, self.post)
 
-class BlogApiPageTests(APITestCase):
+    def test_public_comment_counter_follows_comment_changes(self):
+        comment = Comment.objects.create(
+            post=self.post,
+            name="Emily",
+            email="emily@example.com",
+            content="Hello world!"
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.public_comment_count, 1)
+
+        comment.is_public = False
+        comment.save()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.public_comment_count, 0)
+
+        comment.is_public = True
+        comment.save()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.public_comment_count, 1)
+
+        comment.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.public_comment_count, 0)
+
+    @skipUnless(connection.features.has_select_for_update, "needs SELECT ... FOR UPDATE")
+    def test_comment_update_locks_the_previous_state(self):
+        comment = Comment.objects.create(post=self.post, name="A", email="a@example.com",
+                                         content="1")
+        comment.is_public = False
+        with CaptureQueriesContext(connection) as queries:
+            comment.save()
+        self.assertTrue(any('FOR UPDATE' in query['sql'] for query in queries))
+
+    def test_full_post_save_keeps_comment_count(self):
+        stale = Post.objects.get(pk=self.post.pk)
+        Comment.objects.create(post=self.post, name="A", email="a@example.com", content="1")
+        stale.title = "Edited in the admin"
+        stale.save()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.title, "Edited in the admin")
+        self.assertEqual(self.post.public_comment_count, 1)
+
+    def test_recount_comments_command(self):
+        Comment.objects.create(post=self.post, name="A", email="a@example.com", content="1")
+        Comment.objects.create(post=self.post, name="B", email="b@example.com", content="2",
+                               is_public=False)
+        Post.objects.update(public_comment_count=42)
+        version = get_model_versions([Post])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('recount_comments', stdout=StringIO())
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.public_comment_count, 1)
+        self.assertNotEqual(get_model_versions([Post]), version)
+
+class BlogApiPageTests(TemporaryMediaMixin, APITestCase):
     def setUp(self):
+        # Versions are bumped on commit, which a TestCase never reaches.
+        cache.clear()
         self.sample_file = SimpleUploadedFile(
             name='test.jpg',
             content=b'file_content',
@@ -333,7 +403,6 @@ class BlogApiPageTests(APITestCase):
     def tearDown(self):
         self.image.image.delete(save=False)
         self.image.delete()
-        self.patcher.stop()
 
         self.author.avatar.delete(save=False)
         self.second_author.avatar.delete(save=False)
@@ -378,7 +447,8 @@ class BlogApiPageTests(APITestCase):
             self.assertEqual(payload['id'], page.id)
             self.assertIn('slug', payload)
             self.assertEqual(payload['slug'], page.slug)
-            self.assertEqual(len(payload), 12)
+            self.assertEqual(len(payload), 13)
+            self.assertEqual(payload['image_srcset'], [])
 
     def test_tags(self):
         response = self.client.get(self.tags)
@@ -398,6 +468,329 @@ class BlogApiPageTests(APITestCase):
         self.assertIn('BlogCount', payload[0])
         self.assertEqual(payload[0]['BlogCount'], 6)
 
+class BlogApiPageQueryCountTests(APITestCase):
+    def setUp(self):
+        # Versions are bumped on commit, which a TestCase never reaches.
+        cache.clear()
+        self.author = Author.objects.create(name="Query Author", email="query@example.com",
+                                            avatar="authors/avatars/query.webp")
+        self.category = Category.objects.create(title="Query Category")
+        self.tags = [Tag.objects.create(name=f"tag {i}") for i in range(3)]
+        self.sample_date = timezone.now() - timedelta(days=1)
+
+        for i in range(24):
+            post = Post.objects.create(
+                title=f"Query Post {i}",
+                excerpt="Excerpt.",
+                image=f"posts/images/query-{i}.webp",
+                category=self.category,
+                published_at=self.sample_date - timedelta(minutes=i),
+                author=self.author,
+                content="Content.",
+                slug=f"query-post-{i}",
+            )
+            post.tags.add(*self.tags)
+            Comment.objects.create(post=post, name="Anna", email="anna@example.com",
+                                   content="Public comment.")
+            Comment.objects.create(post=post, name="Bob", email="bob@example.com",
+                                   content="Hidden comment.", is_public=False)
+
+        self.post_page = lambda page: reverse('BlogApi:post-page',
+                                              kwargs={'page_number': page})
+
+    def test_page_query_count_is_constant(self):
+        # The first request builds the cached match set.
+        self.client.get(self.post_page(1))
+        for per_page in (3, 24):
+            with self.assertNumQueries(2):
+                response = self.client.get(self.post_page(1), {'per_page': per_page})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            payload = json.loads(response.content)
+            self.assertEqual(len(payload['posts']), per_page)
+
+    def test_page_counts_only_public_comments(self):
+        response = self.client.get(self.post_page(1), {'per_page': 24})
+        payload = json.loads(response.content)
+        self.assertTrue(all(post['comments'] == 1 for post in payload['posts']))
+        self.assertTrue(all(len(post['tags']) == 3 for post in payload['posts']))
+
+    def test_cursor_pagination_walks_whole_feed(self):
+        slugs = []
+        cursor = ''
+        while cursor is not None:
+            response = self.client.get(self.post_page(1), {'per_page': 10, 'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            payload = json.loads(response.content)
+            self.assertIn('next', payload)
+            slugs.extend(post['slug'] for post in payload['posts'])
+            cursor = payload['next']
+
+        self.assertEqual(slugs, [f"query-post-{i}" for i in range(24)])
+
+    def test_cursor_pagination_matches_page_numbers(self):
+        response = self.client.get(self.post_page(1), {'per_page': 5, 'cursor': ''})
+        cursor = json.loads(response.content)['next']
+        by_cursor = json.loads(self.client.get(
+            self.post_page(1), {'per_page': 5, 'cursor': cursor}).content)
+        by_page = json.loads(self.client.get(self.post_page(2), {'per_page': 5}).content)
+        self.assertEqual(by_cursor['posts'], by_page['posts'])
+        self.assertNotIn('next', by_page)
+
+    def test_invalid_per_page_is_rejected(self):
+        for per_page in ('0', '-3', 'abc', '101'):
+            for params in ({}, {'cursor': ''}):
+                with self.subTest(per_page=per_page, **params):
+                    response = self.client.get(self.post_page(1), {'per_page': per_page, **params})
+                    self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                    self.assertIn('per_page', json.loads(response.content)['error'])
+
+    def test_title_search_filter(self):
+        response = self.client.get(self.post_page(1), {
+            'per_page': 24, 'filter': json.dumps({'title': 'Query Post 1'})})
+        payload = json.loads(response.content)
+        self.assertEqual(len(payload['posts']), 11)
+
+    def test_tag_filter_modes(self):
+        extra = Tag.objects.create(name="extra")
+        for post in Post.objects.filter(slug__in=["query-post-0", "query-post-1"]):
+            post.tags.add(extra)
+        Post.objects.get(slug="query-post-2").tags.remove(self.tags[0])
+
+        def slugs(filt):
+            response = self.client.get(self.post_page(1), {'per_page': 24,
+                                                           'filter': json.dumps(filt)})
+            return {post['slug'] for post in json.loads(response.content)['posts']}
+
+        self.assertEqual(slugs({'tags': [self.tags[0].slug, extra.slug]}),
+                         {"query-post-0", "query-post-1"})
+        self.assertEqual(len(slugs({'tags': [self.tags[0].slug, self.tags[1].slug]})), 23)
+        self.assertEqual(len(slugs({'tags': [self.tags[0].slug, extra.slug],
+                                    'tags_mode': 'any'})), 23)
+        self.assertEqual(slugs({'tags': [extra.slug, extra.slug]}),
+                         {"query-post-0", "query-post-1"})
+
+    def test_tag_filter_query_count_does_not_grow(self):
+        # The first request caches the publication marker behind the validators.
+        self.client.get(self.post_page(1), {'cursor': ''})
+        for tags in (self.tags[:1], self.tags):
+            filt = json.dumps({'tags': [tag.slug for tag in tags]})
+            with self.assertNumQueries(2):
+                self.client.get(self.post_page(1), {'filter': filt, 'cursor': ''})
+
+    def test_equivalent_filters_share_one_match_set(self):
+        first = json.dumps({'tags': [self.tags[0].slug, self.tags[1].slug], 'title': 'Query'})
+        response = self.client.get(self.post_page(1), {'filter': first})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        same = json.dumps({'title': '  QUERY ', 'tags': [self.tags[1].slug, self.tags[0].slug,
+                                                         self.tags[0].slug]}, indent=2)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.post_page(2), {'filter': same})
+        self.assertEqual(len(json.loads(response.content)['posts']), 6)
+
+        count_url = reverse('BlogApi:post_page_count', kwargs={'post_per_page': 6})
+        with self.assertNumQueries(0):
+            response = self.client.get(count_url, {'filter': same})
+        self.assertEqual(json.loads(response.content)['count'], 4)
+
+    def test_match_set_follows_post_changes(self):
+        count_url = reverse('BlogApi:post_page_count', kwargs={'post_per_page': 1})
+        self.assertEqual(json.loads(self.client.get(count_url).content)['count'], 24)
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.get(slug="query-post-0").delete()
+        self.assertEqual(json.loads(self.client.get(count_url).content)['count'], 23)
+
+    def test_meta_combines_page_and_count(self):
+        self.client.get(self.post_page(1))
+        with self.assertNumQueries(2):
+            response = self.client.get(self.post_page(2), {'per_page': 10, 'meta': 1})
+        payload = json.loads(response.content)
+        self.assertEqual(payload['total'], 24)
+        self.assertEqual(payload['pages'], 3)
+        self.assertEqual(len(payload['posts']), 10)
+        self.assertIn('/blog-api/post-page/3?', payload['links']['next'])
+        self.assertIn('per_page=10', payload['links']['next'])
+        self.assertIn('/blog-api/post-page/1?', payload['links']['prev'])
+
+        last = json.loads(self.client.get(self.post_page(3), {'per_page': 10, 'meta': 1}).content)
+        self.assertEqual(len(last['posts']), 4)
+        self.assertIsNone(last['links']['next'])
+
+    def test_meta_with_cursor_links_next_cursor(self):
+        payload = json.loads(self.client.get(
+            self.post_page(1), {'per_page': 10, 'cursor': '', 'meta': 1}).content)
+        self.assertEqual(payload['total'], 24)
+        self.assertIn(f"cursor={payload['next']}", payload['links']['next'])
+        self.assertIsNone(payload['links']['prev'])
+
+    def test_meta_with_invalid_per_page_returns_400(self):
+        for per_page in ('0', '-1', 'ten'):
+            with self.subTest(per_page=per_page):
+                response = self.client.get(self.post_page(1), {'per_page': per_page, 'meta': 1})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_page_without_meta_keeps_old_shape(self):
+        payload = json.loads(self.client.get(self.post_page(1)).content)
+        self.assertEqual(set(payload), {'page', 'posts'})
+        for meta in ('0', 'false', 'False', ''):
+            with self.subTest(meta=meta):
+                payload = json.loads(self.client.get(self.post_page(1), {'meta': meta}).content)
+                self.assertEqual(set(payload), {'page', 'posts'})
+
+    def test_invalid_meta_returns_400(self):
+        response = self.client.get(self.post_page(1), {'meta': 'maybe'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_page_count_matches_meta_pages(self):
+        for per_page in (1, 5, 10, 24, 25):
+            with self.subTest(per_page=per_page):
+                count_url = reverse('BlogApi:post_page_count', kwargs={'post_per_page': per_page})
+                count = json.loads(self.client.get(count_url).content)['count']
+                meta = json.loads(self.client.get(
+                    self.post_page(1), {'per_page': per_page, 'meta': 'true'}).content)
+                self.assertEqual(count, meta['pages'])
+        # 24 posts, 5 a page: the partial last page counts.
+        count_url = reverse('BlogApi:post_page_count', kwargs={'post_per_page': 5})
+        self.assertEqual(json.loads(self.client.get(count_url).content)['count'], 5)
+        count_url = reverse('BlogApi:post_page_count', kwargs={'post_per_page': 0})
+        self.assertEqual(self.client.get(count_url).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_filter_returns_400(self):
+        for filt in ('{"tags": "python"}', '[1, 2]', '{"tags_mode": "some"}', '{oops'):
+            response = self.client.get(self.post_page(1), {'filter': filt})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @skipIf(connection.vendor == 'postgresql', "covered by PostgresSearchTests")
+    def test_rebuild_search_index_without_postgres(self):
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn("PostgreSQL", out.getvalue())
+
+    def test_invalid_cursor_returns_400(self):
+        response = self.client.get(self.post_page(1), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get(self.post_page(1))['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.post_page(1), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(post=Post.objects.get(slug="query-post-0"), name="Cid",
+                                   email="cid@example.com", content="Another comment.")
+        response = self.client.get(self.post_page(1), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_scheduled_publication_changes_etag(self):
+        Post.objects.create(title="Scheduled", excerpt="E", category=self.category,
+                            image="posts/images/scheduled.webp",
+                            author=self.author, content="C", slug="scheduled",
+                            published_at=timezone.now() + timedelta(seconds=1))
+        etag = self.client.get(self.post_page(1))['ETag']
+        time.sleep(2.1)
+        response = self.client.get(self.post_page(1), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+@skipUnless(connection.vendor == 'postgresql', "full-text search needs PostgreSQL")
+class PostgresSearchTests(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(name="Search Author", email="search@example.com")
+        self.category = Category.objects.create(title="Search Category")
+
+    def create_post(self, title, content="Plain content."):
+        return Post.objects.create(title=title, excerpt="Excerpt.", image="posts/images/s.webp",
+                                   category=self.category, published_at=timezone.now(),
+                                   author=self.author, content=content)
+
+    def search(self, text):
+        return list(search_posts(Post.objects.all(), text).values_list('title', flat=True))
+
+    def test_migration_created_gin_index(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Post._meta.db_table)
+        index = constraints['blogapi_post_search_vector_gin']
+        self.assertEqual(index['type'], 'gin')
+        self.assertEqual(index['columns'], ['search_vector'])
+
+    def test_title_matches_rank_above_content_matches(self):
+        self.create_post("Plain title", content="All about kubernetes.")
+        self.create_post("Kubernetes in production")
+        self.create_post("Unrelated")
+        self.assertEqual(self.search("kubernetes"),
+                         ["Kubernetes in production", "Plain title"])
+
+    def test_save_updates_the_vector_when_text_changes(self):
+        post = self.create_post("Draft")
+        post.content = "Now about observability."
+        with CaptureQueriesContext(connection) as queries:
+            post.save()
+        # The row, then the vector computed from it: a second UPDATE on
+        # every save that writes title, excerpt or content.
+        updates = [q for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(self.search("observability"), ["Draft"])
+
+        with CaptureQueriesContext(connection) as queries:
+            post.save(update_fields=['featured'])
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE')]), 1)
+
+    def test_rebuild_search_index(self):
+        self.create_post("Kubernetes in production")
+        Post.objects.update(search_vector=None)
+        self.assertEqual(self.search("kubernetes"), [])
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn("1 posts", out.getvalue())
+        self.assertEqual(self.search("kubernetes"), ["Kubernetes in production"])
+
+
+class BlogCategoriesQueryTests(APITestCase):
+    def setUp(self):
+        # Versions are bumped on commit, which a TestCase never reaches.
+        cache.clear()
+        self.author = Author.objects.create(name="Cat Author", email="cat@example.com")
+        self.categories = [Category.objects.create(title=f"Category {i}") for i in range(5)]
+        past = timezone.now() - timedelta(days=1)
+        for i, category in enumerate(self.categories):
+            for j in range(i):
+                Post.objects.create(title=f"Post {i}-{j}", slug=f"post-{i}-{j}", excerpt="E",
+                                    category=category, author=self.author,
+                                    published_at=past, content="C")
+        self.url = reverse('BlogApi:blog-categories')
+
+    def tearDown(self):
+        cache.delete(CATEGORY_COUNTS_CACHE_KEY)
+
+    def test_counts_use_single_query(self):
+        # The first request caches the publication marker behind the validators.
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        payload = json.loads(response.content)
+        self.assertEqual({c['slug']: c['BlogCount'] for c in payload},
+                         {c.slug: i for i, c in enumerate(self.categories)})
+
+    @override_settings(BLOG_CATEGORY_COUNTS_CACHE=True)
+    def test_cached_counts_are_invalidated_by_post_save(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title="Fresh", slug="fresh", excerpt="E",
+                                category=self.categories[0], author=self.author,
+                                published_at=timezone.now() - timedelta(minutes=1),
+                                content="C")
+            # Invalidated only once the write commits.
+            self.assertIsNotNone(cache.get(CATEGORY_COUNTS_CACHE_KEY))
+        payload = json.loads(self.client.get(self.url).content)
+        counts = {c['slug']: c['BlogCount'] for c in payload}
+        self.assertEqual(counts[self.categories[0].slug], 1)
+
+
 class BlogApiPageEmptyDatabaseTests(APITestCase):
     def setUp(self):
         self.posts_count = lambda count_post_on_page: \
@@ -446,4 +839,42 @@ class BlogApiPageEmptyDatabaseTests(APITestCase):
         response = self.client.get(self.categoryEndpoint)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         payload = json.loads(response.content)
-        self.assertEqual(len(payload), 0)
\ No newline at end of file
+        self.assertEqual(len(payload), 0)
+
+class AsyncPostViewTests(TransactionTestCase):
+    def setUp(self):
+        author = Author.objects.create(name="Async Author", email="async@example.com",
+                                       avatar="authors/avatars/async.webp")
+        category = Category.objects.create(title="Async Category")
+        post = Post.objects.create(title="Async Post", slug="async-post", excerpt="E",
+                                   image="posts/images/async.webp", category=category,
+                                   author=author, published_at=timezone.now(), content="C")
+        post.tags.add(Tag.objects.create(name="async"), Tag.objects.create(name="django"))
+        self.factory = RequestFactory()
+
+    async def test_async_post_matches_sync_post(self):
+        request = self.factory.get('/blog-api/post/async-post')
+        expected = await sync_to_async(PostViewsEndpoint.as_view())(request, slug="async-post")
+        response = await AsyncPostViewsEndpoint.as_view()(request, slug="async-post")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        payload = json.loads(response.content)
+        self.assertEqual(payload, json.loads(expected.content))
+        self.assertEqual({tag['slug'] for tag in payload['tags']}, {"async", "django"})
+
+    async def test_missing_post_returns_404(self):
+        response = await AsyncPostViewsEndpoint.as_view()(
+            self.factory.get('/blog-api/post/missing'), slug="missing")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BenchTagFilterTests(TestCase):
+    def test_runs_repeatedly_next_to_existing_rows(self):
+        Category.objects.create(title="Bench", slug="bench")
+        Tag.objects.create(name="bench 0", slug="bench-0")
+        for _ in range(2):
+            out = StringIO()
+            call_command('bench_tag_filter', posts=20, tags=10, repeat=1, stdout=out)
+            self.assertIn("any-of", out.getvalue())
+        self.assertEqual(Category.objects.count(), 1)
+        self.assertEqual(Tag.objects.count(), 1)
+        self.assertFalse(Post.objects.exists())
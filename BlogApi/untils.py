@@ -1,16 +1,302 @@
+import base64
+import hashlib
 import json
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Count, F, Max, Q, QuerySet
+from django.utils import timezone
+
+from BlogApi.models import Category, Post, Tag
+from api.cache import get_model_versions, single_flight
+
+CATEGORY_COUNTS_CACHE_KEY = 'blog:category-post-counts'
+MATCH_SET_KEY = 'blog:post-ids:{}:{}'
+LATEST_PUBLICATION_KEY = 'blog:latest-publication:{}'
+TAGS_ALL = 'all'
+TAGS_ANY = 'any'
+
+
+def filter_by_tags(posts : QuerySet, slugs, mode=TAGS_ALL):
+    """
+    Keep posts tagged with all (``mode='all'``) or any (``mode='any'``) of
+    ``slugs``. Either way it is one subquery over the post/tag table, so the
+    plan does not grow with the number of tags.
+    """
+    slugs = set(slugs)
+    tagged = Post.tags.through.objects.filter(tag__slug__in=slugs)
+
+    if mode == TAGS_ANY:
+        return posts.filter(pk__in=tagged.values('post_id'))
+    if mode != TAGS_ALL:
+        raise ValueError(f'Unknown tags_mode {mode!r}')
+
+    matching = (tagged.values('post_id')
+                .annotate(matched=Count('tag_id', distinct=True))
+                .filter(matched=len(slugs))
+                .values('post_id'))
+    return posts.filter(pk__in=matching)
+
+
+def search_posts(posts : QuerySet, text):
+    """
+    Full-text search over the weighted Post.search_vector, best matches
+    first. Databases other than PostgreSQL fall back to a title match.
+    """
+    if connections[posts.db].vendor != 'postgresql':
+        return posts.filter(title__icontains=text)
+
+    query = SearchQuery(text, search_type='websearch', config=settings.POST_SEARCH_CONFIG)
+    return (posts.filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F('search_vector'), query))
+            .order_by('-search_rank', *posts.query.order_by))
+
+
+class PostFilter:
+    """
+    Validated, normalized form of the ``?filter=`` JSON accepted by the blog
+    listing endpoints. Filters that differ only in key order, tag order,
+    duplicate tags, case or whitespace get the same ``cache_hash``.
+    """
+
+    def __init__(self, title='', tags=(), tags_mode=TAGS_ALL, category=''):
+        self.title = ' '.join(title.split()).lower()
+        self.tags = tuple(sorted(set(tags)))
+        # With fewer than two tags "any" and "all" select the same posts.
+        self.tags_mode = tags_mode if len(self.tags) > 1 else TAGS_ALL
+        self.category = category.strip()
+
+    @classmethod
+    def from_json(cls, filt_json):
+        """
+        Parse the raw ``filter`` parameter. Raises ValueError when it is not
+        a JSON object of the expected shape.
+        """
+        if not filt_json:
+            return cls()
+        data = json.loads(filt_json)
+        if not isinstance(data, dict):
+            raise ValueError('Filter must be a JSON object')
+
+        title = data.get('title') or ''
+        tags = data.get('tags') or []
+        tags_mode = data.get('tags_mode') or TAGS_ALL
+        category = data.get('category') or ''
+        if (not isinstance(title, str) or not isinstance(category, str)
+                or not isinstance(tags, list)
+                or not all(isinstance(tag, str) for tag in tags)):
+            raise ValueError('Invalid filter field type')
+        if tags_mode not in (TAGS_ALL, TAGS_ANY):
+            raise ValueError(f'Unknown tags_mode {tags_mode!r}')
+        return cls(title, tags, tags_mode, category)
+
+    def canonical(self):
+        return {
+            'title': self.title,
+            'tags': list(self.tags),
+            'tags_mode': self.tags_mode,
+            'category': self.category,
+        }
+
+    @property
+    def cache_hash(self):
+        canonical = json.dumps(self.canonical(), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha1(canonical.encode()).hexdigest()
+
+    def apply(self, posts : QuerySet):
+        if self.title:
+            posts = search_posts(posts, self.title)
+        if self.tags:
+            posts = filter_by_tags(posts, self.tags, self.tags_mode)
+        if self.category:
+            posts = posts.filter(category__slug=self.category)
+        return posts
 
-from django.db.models import QuerySet
 
 def filter_posts(posts : QuerySet, filt_json):
-    filt_json = json.loads(filt_json)
+    return PostFilter.from_json(filt_json).apply(posts)
+
+
+def published_posts(post_filter=None, now=None):
+    """
+    Published posts, newest first (best match first when searching).
+    """
+    posts = (Post.objects
+             .filter(published_at__lte=now or timezone.now())
+             .order_by('-published_at', '-pk'))
+    if post_filter is not None:
+        posts = post_filter.apply(posts)
+    return posts
+
+
+def matching_post_ids(post_filter):
+    """
+    Ordered ids of the published posts matching ``post_filter``.
+
+    The list is cached per filter hash and Post/Tag/Category versions, so
+    the listing and page-count endpoints share one computed match set. It
+    is rebuilt once the next scheduled post goes live.
+    """
+    key = MATCH_SET_KEY.format(
+        post_filter.cache_hash,
+        '.'.join(str(v) for v in get_model_versions((Post, Tag, Category))),
+    )
+
+    def compute():
+        now = timezone.now()
+        upcoming = (Post.objects.filter(published_at__gt=now)
+                    .order_by('published_at')
+                    .values_list('published_at', flat=True)
+                    .first())
+        return {
+            'ids': list(published_posts(post_filter, now).values_list('pk', flat=True)),
+            'valid_until': upcoming.timestamp() if upcoming else None,
+        }
+
+    entry = single_flight(key, compute)
+    if entry['valid_until'] is not None and time.time() >= entry['valid_until']:
+        cache.delete(key)
+        entry = single_flight(key, compute)
+    return entry['ids']
+
+
+def posts_by_ids(ids):
+    """
+    Listing rows for ``ids`` in that order: authors and categories joined,
+    tags prefetched.
+    """
+    posts = (Post.objects.filter(pk__in=ids)
+             .select_related('author', 'category')
+             .prefetch_related('tags')
+             .in_bulk())
+    return [posts[pk] for pk in ids if pk in posts]
+
+
+def encode_post_cursor(post):
+    """
+    Build an opaque cursor pointing just after ``post`` in the
+    ``-published_at, -pk`` ordering of the feed.
+    """
+    raw = json.dumps([post.published_at.isoformat(), post.pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_post_cursor(cursor):
+    """
+    Inverse of ``encode_post_cursor``. Raises ValueError on malformed input.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        published_at, pk = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(published_at), int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def posts_after_cursor(posts : QuerySet, cursor):
+    """
+    Keyset page: posts strictly after the cursor, seeking through the
+    ``(published_at, id)`` index instead of scanning past an OFFSET.
+    """
+    published_at, pk = decode_post_cursor(cursor)
+    return posts.filter(Q(published_at__lt=published_at) |
+                        Q(published_at=published_at, pk__lt=pk))
+
+
+def next_publication_timeout(timeout, now=None):
+    """
+    Shorten ``timeout`` so a cache entry expires when the next scheduled
+    post goes live; publishing by the clock fires no save signal.
+    """
+    now = now or timezone.now()
+    upcoming = (Post.objects.filter(published_at__gt=now)
+                .order_by('published_at')
+                .values_list('published_at', flat=True)
+                .first())
+    if upcoming is None:
+        return timeout
+    return max(1, min(timeout, int((upcoming - now).total_seconds()) + 1))
+
+
+def category_post_counts(now=None):
+    """
+    Published post count per category, computed with one grouped query.
+    """
+    now = now or timezone.now()
+    categories = Category.objects.annotate(
+        blog_count=Count('posts', filter=Q(posts__published_at__lt=now))
+    )
+    return [{
+        'title': category.title,
+        'slug': category.slug,
+        'BlogCount': category.blog_count,
+    } for category in categories]
+
+
+def cached_category_post_counts():
+    """
+    ``category_post_counts`` served from the cache. The entry is deleted by
+    the Post/Category signal handlers and expires when a scheduled post
+    is published.
+    """
+    data = cache.get(CATEGORY_COUNTS_CACHE_KEY)
+    if data is None:
+        now = timezone.now()
+        data = category_post_counts(now)
+        cache.set(CATEGORY_COUNTS_CACHE_KEY, data,
+                  next_publication_timeout(settings.PAGE_CACHE_TIME, now))
+    return data
+
+
+def latest_publication():
+    """
+    Publication time of the newest published post. It moves when a
+    scheduled post goes live, which no save signal reports, so listings
+    fold it into their validators.
+    """
+    version, = get_model_versions([Post])
+    key = LATEST_PUBLICATION_KEY.format(version)
+    latest = cache.get(key)
+    if latest is None:
+        now = timezone.now()
+        latest = (Post.objects.filter(published_at__lte=now)
+                  .aggregate(latest=Max('published_at'))['latest']) or ''
+        cache.set(key, latest, next_publication_timeout(settings.PAGE_CACHE_TIME, now))
+    return latest or None
 
-    if 'title' in filt_json and filt_json['title'] != '':
-        posts = posts.filter(title__icontains=filt_json['title'])
-    if 'tags' in filt_json:
-        for slug in filt_json['tags']:
-            posts = posts.filter(tags__slug=slug)
-    if 'category' in filt_json and filt_json['category'] != '':
-        posts = posts.filter(category__slug=filt_json['category'])
 
-    return posts
\ No newline at end of file
+def post_detail_payload(post, tags):
+    """
+    Serialize a post for the detail endpoint.
+    """
+    return {
+        'id': post.pk,
+        'slug': post.slug,
+        'title': post.title,
+        'excerpt': post.excerpt,
+        'image': post.image.url or "",
+        'image_srcset': post.image_srcset,
+        'category': {
+            'title': post.category.title,
+            'slug': post.category.slug,
+        },
+        'read_time': post.read_time,
+        'publish_at': post.published_at.strftime("%d-%m-%Y"),
+        'tags': [
+            {
+                'name': tag.name,
+                'slug': tag.slug
+            } for tag in tags
+        ],
+        'date': post.published_at.strftime('%d-%m-%Y'),
+        'content': post.content,
+        'author': {
+            'name': post.author.name,
+            'bio': post.author.bio,
+            'avatar': post.author.avatar.url,
+        },
+    }
@@ -1,6 +1,10 @@
+from django.conf import settings
 from django.urls import path
 from BlogApi.views import *
 
+if settings.ASYNC_READ_VIEWS:
+    PostViewsEndpoint = AsyncPostViewsEndpoint
+
 
 app_name = 'BlogApi'
 
@@ -1,21 +1,91 @@
 import json
+import math
 from datetime import timezone
 
-from django.http import JsonResponse
+from django.conf import settings
+from django.urls import reverse
 from django.utils import timezone
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from django.views import View
 from rest_framework import status, permissions
+from rest_framework.fields import BooleanField
 from rest_framework.views import APIView
 
-from BlogApi.models import Post, Tag, Category
-from BlogApi.untils import filter_posts
+from BlogApi.models import Post, Tag, Category, Author, Comment
+from BlogApi.untils import (PostFilter, matching_post_ids, published_posts, posts_by_ids,
+                            posts_after_cursor, encode_post_cursor,
+                            category_post_counts, cached_category_post_counts,
+                            latest_publication, post_detail_payload)
+from api.cache import conditional, models_last_modified, versioned_cache
+from api.renderers import JsonResponse
+from api.untils import gather_queries
+
+# Models a post detail response is rendered from.
+POST_DETAIL_MODELS = (Post, Category, Tag, Author)
+# Models a published post listing is rendered from.
+LISTING_MODELS = (Post, Category, Tag, Author, Comment)
+DEFAULT_PER_PAGE = 6
+MAX_PER_PAGE = 100
+
+
+def parse_per_page(value):
+    """
+    The ``per_page`` query parameter as an int from 1 to MAX_PER_PAGE;
+    raises ValueError otherwise.
+    """
+    per_page = DEFAULT_PER_PAGE if value is None else int(value)
+    if not 1 <= per_page <= MAX_PER_PAGE:
+        raise ValueError(per_page)
+    return per_page
+
+
+def parse_flag(value):
+    """
+    A boolean query parameter: absent or empty is False, otherwise one of the
+    values DRF's BooleanField accepts ("1", "true", "0", "false", ...) in
+    any case; raises ValueError for anything else.
+    """
+    if not value:
+        return False
+    value = value.lower()
+    if value in BooleanField.TRUE_VALUES:
+        return True
+    if value in BooleanField.FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+def page_count(total, per_page):
+    """
+    Pages needed to list ``total`` posts ``per_page`` at a time; the last
+    one may be partial.
+    """
+    return math.ceil(total / per_page)
+
+
+def listing_etag(request, *args, **kwargs):
+    return str(latest_publication())
+
+
+def listing_last_modified(request, *args, **kwargs):
+    """
+    Last write to the listing models, or the last publication if a
+    scheduled post went live since.
+    """
+    stamps = [models_last_modified(LISTING_MODELS), latest_publication()]
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps) if stamps else None
+
+
+def listing_conditional(*models):
+    return conditional(*models, last_modified=listing_last_modified,
+                       etag_extra=listing_etag)
 
 
 class PostViewsEndpoint(APIView):
     permission_classes = (permissions.AllowAny,)
 
-    @method_decorator(cache_page(60))
+    @conditional(*POST_DETAIL_MODELS)
+    @versioned_cache(*POST_DETAIL_MODELS)
     def get(self,request, slug=None):
         """
         Get post details
@@ -26,40 +96,39 @@ class PostViewsEndpoint(APIView):
                                 status=status.HTTP_400_BAD_REQUEST)
         try:
             post = Post.objects.get(slug=slug)
-
-            data = {
-                'id': post.pk,
-                'slug': post.slug,
-                'title': post.title,
-                'excerpt': post.excerpt,
-                'image': post.image.url or "",
-                'category': {
-                    'title': post.category.title,
-                    'slug': post.category.slug,
-                },
-                'read_time': post.read_time,
-                'publish_at': post.published_at.strftime("%d-%m-%Y"),
-                'tags': [
-                    {
-                        'name': tag.name,
-                        'slug': tag.slug
-                    } for tag in post.tags.all()
-                ],
-                'date': post.published_at.strftime('%d-%m-%Y'),
-                'content': post.content,
-                'author': {
-                    'name': post.author.name,
-                    'bio': post.author.bio,
-                    'avatar': post.author.avatar.url,
-                },
-            }
+            data = post_detail_payload(post, post.tags.all())
             return JsonResponse(data, status=status.HTTP_200_OK)
         except Post.DoesNotExist:
             return JsonResponse({'error':'Post not found'},
                                 status=status.HTTP_404_NOT_FOUND)
 
+class AsyncPostViewsEndpoint(View):
+    """
+    ``PostViewsEndpoint`` for ASGI: the post and its tags are loaded
+    concurrently.
+    """
+
+    @conditional(*POST_DETAIL_MODELS)
+    @versioned_cache(*POST_DETAIL_MODELS)
+    async def get(self, request, slug=None):
+        if not slug:
+            return JsonResponse({'error':'No post slug provided'},
+                                status=status.HTTP_400_BAD_REQUEST)
+        try:
+            post, tags = await gather_queries(
+                lambda: Post.objects.select_related('author', 'category').get(slug=slug),
+                lambda: list(Tag.objects.filter(posts__slug=slug)),
+            )
+        except Post.DoesNotExist:
+            return JsonResponse({'error':'Post not found'},
+                                status=status.HTTP_404_NOT_FOUND)
+
+        return JsonResponse(post_detail_payload(post, tags), status=status.HTTP_200_OK)
+
 class RelatedPostsViewsEndpoint(APIView):
     permission_classes = (permissions.AllowAny,)
+
+    @listing_conditional(Post, Category)
     def get(self, request, category_slug=None):
         """
         Get 3 related post for main.
@@ -80,6 +149,7 @@ class RelatedPostsViewsEndpoint(APIView):
                     'title': post_data.title,
                     'publish_at': post_data.published_at.strftime("%d-%m-%Y"),
                     'image': post_data.image.url or "",
+                    'image_srcset': post_data.image_srcset,
                 } for post_data in related_posts
             ]
             return JsonResponse(data, status=status.HTTP_200_OK, safe=False)
@@ -88,48 +158,98 @@ class RelatedPostsViewsEndpoint(APIView):
                                 status=status.HTTP_404_NOT_FOUND)
 
 
+def page_link(request, page_number, **params):
+    """
+    Absolute URL of another listing page, keeping the current query string.
+    """
+    query = request.GET.copy()
+    for key, value in params.items():
+        query[key] = value
+    url = reverse('BlogApi:post-page', kwargs={'page_number': page_number})
+    return request.build_absolute_uri(f"{url}?{query.urlencode()}")
+
+
 class PostPagesCountEndpoint(APIView):
     permission_classes = (permissions.AllowAny,)
-    def get(self, request, post_per_page=6):
 
-        filt_json = request.GET.get('filter')
+    @listing_conditional(Post, Category, Tag)
+    def get(self, request, post_per_page=6):
+        if post_per_page < 1:
+            return JsonResponse({'error': 'post_per_page must be at least 1'},
+                                status=status.HTTP_400_BAD_REQUEST)
 
         try:
-
-
-            posts = Post.objects.filter(published_at__gte=timezone.now())
-
-            if filt_json:
-                posts = filter_posts(posts, filt_json)
-
-            count = int(posts.count() / post_per_page)
+            post_filter = PostFilter.from_json(request.GET.get('filter'))
+            count = page_count(len(matching_post_ids(post_filter)), post_per_page)
 
             return JsonResponse({'count': count},status=status.HTTP_200_OK)
 
         except Post.DoesNotExist:
             return JsonResponse({'error':'Post not found'},
                                 status=status.HTTP_404_NOT_FOUND)
+        except ValueError:
+            return JsonResponse(
+                {'error': 'Invalid JSON in filter param'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
 class PostPageViewEndpoint(APIView):
     permission_classes = (permissions.AllowAny,)
-    def get(self, request, page_number=1):
 
-        per_page = request.GET.get('per_page', '6')
+    @listing_conditional(*LISTING_MODELS)
+    def get(self, request, page_number=1):
+        """
+        Get a page of published posts.
 
-        per_page = int(per_page)
+        Passing ``?cursor=`` (empty for the first page) switches to keyset
+        pagination: the response then carries an opaque ``next`` cursor and
+        ``page_number`` is ignored.
 
-        filt_json = request.GET.get('filter')
+        Passing ``?meta=1`` adds ``total``, ``pages`` and next/prev ``links``
+        so the page count does not need a separate request.
+        """
 
         try:
-            posts = (Post.objects.
-                    filter(published_at__lte=timezone.now()).
-                     order_by('-published_at'))
-            if filt_json:
-                posts = filter_posts(posts, filt_json)
+            per_page = parse_per_page(request.GET.get('per_page'))
+        except ValueError:
+            return JsonResponse(
+                {'error': f'per_page must be an integer from 1 to {MAX_PER_PAGE}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            meta = parse_flag(request.GET.get('meta'))
+        except ValueError:
+            return JsonResponse({'error': 'meta must be true or false'},
+                                status=status.HTTP_400_BAD_REQUEST)
 
-            posts = posts.all()
+        cursor = request.GET.get('cursor')
 
-            page = posts[(per_page * (page_number - 1)):(per_page * page_number)]
+        try:
+            post_filter = PostFilter.from_json(request.GET.get('filter'))
+
+            next_cursor = None
+            if cursor is not None:
+                # Keyset pages need the index order, not search ranking.
+                posts = published_posts(post_filter).order_by('-published_at', '-pk')
+                if cursor:
+                    try:
+                        posts = posts_after_cursor(posts, cursor)
+                    except ValueError:
+                        return JsonResponse({'error': 'Invalid cursor'},
+                                            status=status.HTTP_400_BAD_REQUEST)
+                # Join author/category and batch the tags so the page costs
+                # the same number of queries at any size. Fetch one extra
+                # row to know whether another page exists.
+                posts = posts.select_related('author', 'category').prefetch_related('tags')
+                page = list(posts[:per_page + 1])
+                if len(page) > per_page:
+                    page = page[:per_page]
+                    next_cursor = encode_post_cursor(page[-1])
+            else:
+                # The match set is cached per normalized filter and shared
+                # with PostPagesCountEndpoint; only the page rows are loaded.
+                ids = matching_post_ids(post_filter)
+                page = posts_by_ids(ids[(per_page * (page_number - 1)):(per_page * page_number)])
 
             data = {
                 'page': page_number,
@@ -143,9 +263,10 @@ class PostPageViewEndpoint(APIView):
                             'avatar': post.author.avatar.url,
                         },
                         'publish_at': post.published_at.strftime("%d-%m-%Y"),
-                        'comments': post.comment_count,
+                        'comments': post.public_comment_count,
                         'featured': post.featured,
                         'image': post.image.url or "",
+                        'image_srcset': post.image_srcset,
                         'tags': [ {
                             'name': tag.name,
                             'slug': tag.slug
@@ -158,6 +279,25 @@ class PostPageViewEndpoint(APIView):
                     for post in page
                 ]
             }
+            if cursor is not None:
+                data['next'] = next_cursor
+            if meta:
+                total = len(matching_post_ids(post_filter))
+                pages = page_count(total, per_page)
+                if cursor is not None:
+                    links = {
+                        'next': page_link(request, page_number, cursor=next_cursor)
+                        if next_cursor else None,
+                        'prev': None,
+                    }
+                else:
+                    links = {
+                        'next': page_link(request, page_number + 1)
+                        if page_number < pages else None,
+                        'prev': page_link(request, page_number - 1)
+                        if 1 < page_number <= pages + 1 else None,
+                    }
+                data.update({'total': total, 'pages': pages, 'links': links})
             return JsonResponse(data, status=status.HTTP_200_OK)
         except Post.DoesNotExist:
             return JsonResponse({'error':'Post not found'},
@@ -170,6 +310,8 @@ class PostPageViewEndpoint(APIView):
 
 class TagListsEndpoint(APIView):
     permission_classes = (permissions.AllowAny,)
+
+    @conditional(Tag)
     def get(self, request):
         try:
             tag = Tag.objects.all()
@@ -184,15 +326,14 @@ class TagListsEndpoint(APIView):
 
 class BlogCategoriesEndpoint(APIView):
     permission_classes = (permissions.AllowAny,)
+
+    @listing_conditional(Post, Category)
     def get(self, request):
         try:
-            category = Category.objects.all()
-            data = [{
-                'title': category.title,
-                'slug': category.slug,
-                'BlogCount': Post.objects.filter(published_at__lt=timezone.now(),
-                                                 category=category).count(),
-            } for category in category]
+            if settings.BLOG_CATEGORY_COUNTS_CACHE:
+                data = cached_category_post_counts()
+            else:
+                data = category_post_counts()
             return JsonResponse(data, status=status.HTTP_200_OK, safe=False)
         except Category.DoesNotExist:
             return JsonResponse({'error':'not found'},
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ImagesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Images'
+
+    def ready(self):
+        from django.conf import settings
+        from PIL import Image as PILImage
+
+        # Pillow warns above this many pixels and refuses twice as many.
+        PILImage.MAX_IMAGE_PIXELS = settings.IMAGE_MAX_PIXELS
@@ -0,0 +1,121 @@
+"""
+Database-backed queue for image conversions.
+
+The admin stores an upload as it is and calls ``enqueue_conversion``; the
+``process_image_jobs`` command claims pending jobs and runs ``run_job`` in a
+pool of worker processes. A job only applies its result if the row still
+points at the upload it was queued for, so a newer upload always wins.
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from Images.models import ImageJob
+from Images.pipeline import ImageStatus, apply_conversion, convert_image, delete_image_files
+
+SUPERSEDED = "Superseded by a newer upload or deleted."
+
+
+def enqueue_conversion(obj):
+    """
+    Queue the conversion of ``obj.image``, which ``store_image`` just staged.
+    """
+    return ImageJob.objects.create(model=obj._meta.label, object_id=obj.pk,
+                                   source=obj.image.name)
+
+
+def requeue_stale():
+    """
+    Put back jobs whose worker died mid-run.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.IMAGE_JOB_TIMEOUT)
+    return (ImageJob.objects
+            .filter(status=ImageJob.Status.RUNNING, started_at__lt=cutoff)
+            .update(status=ImageJob.Status.PENDING))
+
+
+def claim_jobs(limit):
+    """
+    Mark up to ``limit`` pending jobs as running and return their ids, oldest
+    first. Concurrent workers skip each other's rows.
+    """
+    if limit <= 0:
+        return []
+    with transaction.atomic():
+        ids = list(ImageJob.objects
+                   .select_for_update(skip_locked=True)
+                   .filter(status=ImageJob.Status.PENDING)
+                   .values_list('pk', flat=True)[:limit])
+        ImageJob.objects.filter(pk__in=ids).update(
+            status=ImageJob.Status.RUNNING, started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+    return ids
+
+
+def release_jobs(ids):
+    """
+    Return claimed jobs to the queue, e.g. when the worker shuts down.
+    """
+    return (ImageJob.objects
+            .filter(pk__in=ids, status=ImageJob.Status.RUNNING)
+            .update(status=ImageJob.Status.PENDING))
+
+
+def _finish(job, status, error=''):
+    job.status = status
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+    return status
+
+
+def _fail(job, model, error):
+    message = f"{type(error).__name__}: {error}"
+    if job.attempts < settings.IMAGE_JOB_MAX_ATTEMPTS:
+        job.status = ImageJob.Status.PENDING
+        job.error = message
+        job.save(update_fields=['status', 'error'])
+        return job.status
+    (model.objects
+     .filter(pk=job.object_id, image=job.source)
+     .update(image_status=ImageStatus.FAILED))
+    return _finish(job, ImageJob.Status.FAILED, message)
+
+
+def _run(job):
+    model = apps.get_model(job.model)
+    obj = model.objects.filter(pk=job.object_id).first()
+    if obj is None or obj.image.name != job.source:
+        return _finish(job, ImageJob.Status.DONE, SUPERSEDED)
+
+    try:
+        name, variants = convert_image(obj.image)
+    except Exception as e:
+        return _fail(job, model, e)
+
+    with transaction.atomic():
+        current = model.objects.select_for_update().filter(pk=job.object_id).first()
+        if current is None or current.image.name != job.source:
+            # Replaced while converting: nothing refers to these files.
+            delete_image_files(obj.image, variants)
+            return _finish(job, ImageJob.Status.DONE, SUPERSEDED)
+        apply_conversion(current, name, variants)
+        current.save(update_fields=['image', 'image_variants', 'image_status', 'updated_at'])
+    return _finish(job, ImageJob.Status.DONE)
+
+
+def run_job(job_id):
+    """
+    Convert the upload of one claimed job and record the outcome; returns the
+    job's new status. Runs in a worker process.
+    """
+    try:
+        return _run(ImageJob.objects.get(pk=job_id))
+    finally:
+        # Release the connection the way the request cycle would.
+        close_old_connections()
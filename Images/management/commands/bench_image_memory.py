@@ -0,0 +1,129 @@
+import io
+import math
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from PIL import Image as PILImage
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand, CommandError
+
+from Images.pipeline import convert_stored
+
+MODES = ('legacy', 'pipeline')
+FORMATS = {'jpeg': 'JPEG', 'png': 'PNG'}
+
+
+def reset_peak_rss():
+    # A spawned process inherits its parent's peak RSS through exec; Linux
+    # can reset the high-water mark.
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+def legacy_convert(path):
+    # The conversion the admin classes ran before Images.pipeline existed.
+    img = PILImage.open(path)
+    img = img.convert('RGBA')
+    buff = io.BytesIO()
+    img.save(buff, format='WEBP', quality=85, method=6)
+    buff.seek(0)
+    ContentFile(buff.read())
+    img.close()
+
+
+def measure(mode, path):
+    """
+    Convert ``path`` in this (fresh) process and return the growth of its
+    peak resident memory in MB and the elapsed seconds.
+    """
+    reset_peak_rss()
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    if mode == 'legacy':
+        legacy_convert(path)
+    else:
+        with tempfile.TemporaryDirectory() as output:
+            storage = FileSystemStorage(location=output)
+            with open(path, 'rb') as fp:
+                name = storage.save(os.path.basename(path), fp)
+            convert_stored(storage, name)
+    return peak_rss_mb() - baseline, time.perf_counter() - started
+
+
+def sample_image(directory, megapixels, image_format):
+    width = round(math.sqrt(megapixels * 1_000_000 * 3 / 2))
+    height = round(width * 2 / 3)
+    noise = PILImage.effect_noise((width, height), 40)
+    gradient = PILImage.linear_gradient('L').resize((width, height))
+    img = PILImage.merge('RGB', (noise, gradient, gradient.transpose(PILImage.FLIP_LEFT_RIGHT)))
+    path = os.path.join(directory, f"sample-{megapixels}mp.{image_format}")
+    if image_format == 'png':
+        img.save(path, format='PNG', compress_level=1)
+    else:
+        img.save(path, format='JPEG', quality=90)
+    return path
+
+
+class Command(BaseCommand):
+    help = ("Compare the peak memory and time of converting large images with "
+            "the legacy in-request conversion and with Images.pipeline. Every "
+            "conversion runs in a fresh process so peaks do not carry over.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--megapixels', type=int, default=50,
+                            help="Size of the generated sample images.")
+        parser.add_argument('--format', action='append', choices=FORMATS, dest='formats',
+                            help="Sample format to generate, may be repeated. Defaults to all.")
+        parser.add_argument('--file', action='append', dest='files', default=[],
+                            help="Benchmark this image instead of generated samples, may be repeated.")
+        parser.add_argument('--mode', action='append', choices=MODES, dest='modes',
+                            help="Conversion to run, may be repeated. Defaults to all.")
+
+    def handle(self, *args, **options):
+        for path in options['files']:
+            if not os.path.isfile(path):
+                raise CommandError(f"No such file: {path}")
+        modes = options['modes'] or MODES
+        workdir = tempfile.mkdtemp()
+        try:
+            paths = options['files'] or [
+                sample_image(workdir, options['megapixels'], image_format)
+                for image_format in (options['formats'] or FORMATS)
+            ]
+            self.stdout.write(f"{'image':<28} {'mode':<9} {'pixels':>11} "
+                              f"{'peak MB':>8} {'seconds':>8}")
+            for path in paths:
+                with PILImage.open(path) as img:
+                    pixels = f"{img.width}x{img.height}"
+                for mode in modes:
+                    with ProcessPoolExecutor(max_workers=1, initializer=django.setup,
+                                             mp_context=multiprocessing.get_context('spawn')) as pool:
+                        peak, elapsed = pool.submit(measure, mode, path).result()
+                    self.stdout.write(f"{os.path.basename(path)[:28]:<28} {mode:<9} {pixels:>11} "
+                                      f"{peak:8.1f} {elapsed:8.2f}")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
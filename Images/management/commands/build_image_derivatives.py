@@ -0,0 +1,32 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from Images.pipeline import RESPONSIVE_IMAGE_MODELS, ImageStatus, rebuild_derivatives
+
+
+class Command(BaseCommand):
+    help = ("Render the width-bounded derivatives of stored images that have "
+            "none yet, or of every image with --all (e.g. after changing "
+            "IMAGE_DERIVATIVE_WIDTHS).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', dest='rebuild_all',
+                            help="Rebuild images that already have derivatives too.")
+
+    def handle(self, *args, **options):
+        for label in RESPONSIVE_IMAGE_MODELS:
+            model = apps.get_model(label)
+            # Pending uploads are the process_image_jobs worker's.
+            rows = (model.objects.exclude(image='').exclude(image__isnull=True)
+                    .exclude(image_status=ImageStatus.PENDING))
+            if not options['rebuild_all']:
+                rows = rows.filter(image_variants=[])
+            built = failed = 0
+            for obj in rows.iterator():
+                try:
+                    rebuild_derivatives(obj)
+                    built += 1
+                except (OSError, ValueError) as e:
+                    failed += 1
+                    self.stderr.write(f"{label} {obj.pk} ({obj.image.name}): {e}")
+            self.stdout.write(f"{label}: {built} rebuilt, {failed} failed")
@@ -0,0 +1,80 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Images.jobs import claim_jobs, release_jobs, requeue_stale, run_job
+
+
+def available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class Command(BaseCommand):
+    help = ("Convert queued image uploads to WebP and render their derivatives "
+            "in a pool of worker processes, one per available CPU core by default.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.IMAGE_WORKER_PROCESSES,
+                            help="Worker processes; 0 uses one per available CPU core.")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds between queue checks while idle.")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once the queue is empty.")
+        parser.add_argument('--in-process', action='store_true',
+                            help="Run jobs one at a time in this process (debugging).")
+
+    def report(self, job_id, status):
+        self.stdout.write(f"job {job_id}: {status}")
+
+    def run_in_process(self, options):
+        while True:
+            requeue_stale()
+            ids = claim_jobs(1)
+            if not ids:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+            self.report(ids[0], run_job(ids[0]))
+
+    def handle(self, *args, **options):
+        if options['in_process']:
+            return self.run_in_process(options)
+
+        processes = options['processes'] or available_cpus()
+        self.stdout.write(f"Converting images with {processes} worker processes.")
+        # Spawned workers start clean instead of inheriting this process's
+        # database and cache connections.
+        pool = ProcessPoolExecutor(max_workers=processes, initializer=django.setup,
+                                   mp_context=multiprocessing.get_context('spawn'))
+        running = {}
+        try:
+            while True:
+                requeue_stale()
+                for job_id in claim_jobs(processes - len(running)):
+                    running[pool.submit(run_job, job_id)] = job_id
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                done, _ = wait(running, timeout=options['poll_interval'],
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        status = future.result()
+                    except Exception as e:
+                        # Left running; requeue_stale retries it later.
+                        status = f"error ({type(e).__name__}: {e})"
+                    self.report(job_id, status)
+        finally:
+            release_jobs(list(running.values()))
+            pool.shutdown(cancel_futures=True)
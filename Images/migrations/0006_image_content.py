@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Images', '0005_image_upload_limits'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_digest', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(db_index=True, max_length=255, verbose_name='Converted image')),
+                ('variants', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
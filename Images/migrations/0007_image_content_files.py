@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-18 02:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def list_content_files(apps, schema_editor):
+    ImageContent = apps.get_model('Images', 'ImageContent')
+    ImageContentFile = apps.get_model('Images', 'ImageContentFile')
+    for content in ImageContent.objects.all().iterator():
+        ImageContentFile.objects.bulk_create(
+            ImageContentFile(content=content, name=name)
+            for name in {variant['name'] for variant in content.variants}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Images', '0006_image_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageContentFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(db_index=True, max_length=255)),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='files', to='Images.imagecontent')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('content', 'name'), name='images_content_file_unique')],
+            },
+        ),
+        migrations.RunPython(list_content_files, migrations.RunPython.noop),
+    ]
@@ -5,11 +5,17 @@ from django.db import models
 from django.utils.text import slugify
 from django.utils.html import escape, format_html
 
+from Images.pipeline import ImageStatus, preview_url, srcset, validate_image_upload
+
 
 class Image(models.Model):
     name = models.CharField("Guild name", max_length=50)
-    image = models.ImageField(upload_to='images/')
+    image = models.ImageField(upload_to='images/', validators=[validate_image_upload])
     alt = models.CharField("Alternative text", max_length=120, blank=True, null=True)
+    image_variants = models.JSONField(default=list, blank=True, editable=False)
+    image_status = models.CharField(max_length=10, choices=ImageStatus.choices,
+                                    default=ImageStatus.READY, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["alt", "name"]
@@ -20,7 +26,72 @@ class Image(models.Model):
     @admin.display
     def image_tag(self):
         return format_html('<img src="{}" alt={} height="100" />',
-                           self.image.url, self.alt)
+                           preview_url(self.image, self.image_variants), self.alt)
 
     image_tag.short_description = 'Image'
     image_tag.allow_tags = True
+
+    @property
+    def image_srcset(self):
+        return srcset(self.image, self.image_variants)
+
+
+class ImageJob(models.Model):
+    """
+    A queued WebP conversion of one stored upload, run by the
+    ``process_image_jobs`` worker.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    model = models.CharField("Model label", max_length=100)
+    object_id = models.PositiveBigIntegerField()
+    source = models.CharField("Stored upload", max_length=255)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}: {self.status}"
+
+
+class ImageContent(models.Model):
+    """
+    A finished conversion in IMAGE_CONTENT_ADDRESSED mode, keyed by the digest
+    of the upload's bytes and the conversion settings, so the same picture
+    uploaded again reuses the stored files instead of being converted again.
+    """
+    source_digest = models.CharField(max_length=64, unique=True)
+    name = models.CharField("Converted image", max_length=255, db_index=True)
+    variants = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class ImageContentFile(models.Model):
+    """
+    One stored file listed by an ``ImageContent``, so the conversions that
+    still reference a content-addressed file are found by an indexed lookup.
+    """
+    content = models.ForeignKey(ImageContent, on_delete=models.CASCADE, related_name='files')
+    name = models.CharField(max_length=255, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['content', 'name'], name='images_content_file_unique'),
+        ]
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,379 @@
+"""
+Responsive image pipeline shared by the Image, Post, Project and About
+uploads.
+
+An upload is stored as it is, marked pending on the model's
+``image_status``, and converted by the ``process_image_jobs`` worker into a
+full-resolution WebP plus one WebP per ``IMAGE_DERIVATIVE_WIDTHS`` entry
+narrower than the original. The converted files are recorded on the model's
+``image_variants`` JSON field as ``{'name', 'width', 'height'}`` entries,
+narrowest first, ending with the original, so the API can hand out a srcset
+without touching storage.
+
+With IMAGE_CONTENT_ADDRESSED the converted files are named by the SHA-256 of
+their bytes under ``content/`` and shared by every row that uses the same
+picture; an upload whose bytes were converted before (under the same
+settings) reuses that conversion without queueing a job.
+"""
+import functools
+import hashlib
+import os
+import tempfile
+import uuid
+
+from PIL import Image as PILImage
+from PIL import ImageOps
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import models, transaction
+from django.utils.text import slugify
+
+RESPONSIVE_IMAGE_MODELS = ('Images.Image', 'BlogApi.Post', 'ProjectApi.Project', 'api.About')
+CONTENT_DIR = 'content'
+
+
+class ImageStatus(models.TextChoices):
+    PENDING = 'pending', 'Waiting for conversion'
+    READY = 'ready', 'Ready'
+    FAILED = 'failed', 'Conversion failed'
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+def validate_image_upload(value):
+    """
+    Model field validator: reject new uploads over IMAGE_MAX_UPLOAD_SIZE
+    bytes or IMAGE_MAX_PIXELS pixels. Only the header is read, nothing is
+    decoded. Files already stored are not checked again.
+    """
+    if getattr(value, '_committed', True):
+        return
+    if value.size > settings.IMAGE_MAX_UPLOAD_SIZE:
+        raise ValidationError(
+            f"The image is larger than {settings.IMAGE_MAX_UPLOAD_SIZE // 2 ** 20} MB.")
+    try:
+        value.seek(0)
+        with PILImage.open(value) as img:
+            check_pixels(img)
+    except (ImageTooLarge, PILImage.DecompressionBombError) as e:
+        raise ValidationError(str(e))
+    except OSError:
+        raise ValidationError("Upload a valid image.")
+    finally:
+        value.seek(0)
+
+
+def check_pixels(img):
+    if img.width * img.height > settings.IMAGE_MAX_PIXELS:
+        raise ImageTooLarge(f"The image has {img.width}x{img.height} pixels, more than the "
+                            f"{settings.IMAGE_MAX_PIXELS} allowed.")
+
+
+def decode_bounded(fp):
+    """
+    Decode an image with its long edge bounded by IMAGE_MAX_DIMENSION (0 for
+    no bound), oriented by its EXIF tag and in a mode WebP can encode. Returns
+    the image, the source format and the source size.
+
+    The pixel count is checked from the header before anything is decoded.
+    JPEGs are decoded at the smallest of 1/2, 1/4 or 1/8 scale that still
+    covers the bound, so a large photo never exists at full size in memory;
+    other formats are reduced right after decoding. Every later step works
+    on the bounded copy.
+    """
+    img = PILImage.open(fp)
+    try:
+        check_pixels(img)
+        source_format, source_size = img.format, img.size
+        has_alpha = 'A' in img.getbands() or 'transparency' in img.info
+        mode = 'RGBA' if has_alpha else 'RGB'
+        if img.mode in ('1', 'P'):
+            # Palette images only resample with NEAREST; expand them first.
+            img = img.convert(mode)
+        bound = settings.IMAGE_MAX_DIMENSION
+        if bound and max(img.size) > bound:
+            scale = bound / max(img.size)
+            target = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+            # Draft against the bounded size itself: thumbnail() would draft
+            # against the square (bound, bound) box, which the short edge of
+            # a large photo never falls under.
+            img.draft(mode, target)
+            img.thumbnail(target, PILImage.LANCZOS, reducing_gap=None)
+        img.load()
+        ImageOps.exif_transpose(img, in_place=True)
+        if img.mode != mode:
+            img = img.convert(mode)
+    except BaseException:
+        img.close()
+        raise
+    return img, source_format, source_size
+
+
+def file_digest(fp, salt=b''):
+    digest = hashlib.sha256(salt)
+    fp.seek(0)
+    for chunk in iter(lambda: fp.read(2 ** 16), b''):
+        digest.update(chunk)
+    fp.seek(0)
+    return digest.hexdigest()
+
+
+def source_digest(fp):
+    """
+    Digest of an upload's bytes and of the settings its conversion depends
+    on, the key of ``ImageContent``.
+    """
+    options = (sorted(set(settings.IMAGE_DERIVATIVE_WIDTHS)), settings.IMAGE_WEBP_QUALITY,
+               settings.IMAGE_MAX_DIMENSION)
+    return file_digest(fp, salt=repr(options).encode())
+
+
+def is_content_name(name):
+    return name.startswith(f"{CONTENT_DIR}/")
+
+
+def save_content(storage, fp, ext='.webp'):
+    """
+    Save ``fp`` under the content hash of its bytes, unless a file with that
+    hash is stored already. Returns the name.
+    """
+    digest = file_digest(fp)
+    name = f"{CONTENT_DIR}/{digest[:2]}/{digest}{ext}"
+    if storage.exists(name):
+        return name
+    return storage.save(name, File(fp, name=name))
+
+
+def save_webp(storage, name, img):
+    """
+    Encode ``img`` as WebP straight into a spooled temporary file (on disk
+    once it outgrows FILE_UPLOAD_MAX_MEMORY_SIZE) and save it to ``storage``
+    as ``name``, or by content hash with IMAGE_CONTENT_ADDRESSED. Returns the
+    stored name.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE) as buff:
+        img.save(buff, format='WEBP', quality=settings.IMAGE_WEBP_QUALITY, method=6)
+        if settings.IMAGE_CONTENT_ADDRESSED:
+            return save_content(storage, buff)
+        buff.seek(0)
+        return storage.save(name, File(buff, name=name))
+
+
+def render_derivatives(img, name, storage):
+    """
+    Save the width-bounded derivatives of ``img`` next to ``name`` and return
+    the variant list, ending with the original itself.
+    """
+    stem = os.path.splitext(name)[0]
+    variants = []
+    for width in sorted(set(settings.IMAGE_DERIVATIVE_WIDTHS)):
+        if width >= img.width:
+            break
+        height = max(1, round(img.height * width / img.width))
+        resized = img.resize((width, height), PILImage.LANCZOS, reducing_gap=3.0)
+        stored = save_webp(storage, f"{stem}-{width}w.webp", resized)
+        resized.close()
+        variants.append({'name': stored, 'width': width, 'height': height})
+    variants.append({'name': name, 'width': img.width, 'height': img.height})
+    return variants
+
+
+def discard_files(storage, names):
+    """
+    Delete stored files. Content-addressed ones may be shared with other rows,
+    so they are handed to ``release_content`` once the transaction commits.
+    """
+    shared = {name for name in names if is_content_name(name)}
+    for name in set(names) - shared:
+        if storage.exists(name):
+            storage.delete(name)
+    if shared:
+        transaction.on_commit(functools.partial(release_content, storage, shared))
+
+
+def variant_names(variants):
+    return {variant['name'] for variant in variants or ()}
+
+
+def record_conversion(digest, name, variants):
+    """
+    Record the conversion of an upload digest, with one ``ImageContentFile``
+    per file it lists.
+    """
+    ImageContentFile = apps.get_model('Images.ImageContentFile')
+    with transaction.atomic():
+        content, _ = apps.get_model('Images.ImageContent').objects.update_or_create(
+            source_digest=digest, defaults={'name': name, 'variants': variants})
+        content.files.all().delete()
+        ImageContentFile.objects.bulk_create(
+            ImageContentFile(content=content, name=file_name)
+            for file_name in variant_names(variants)
+        )
+    return content
+
+
+def release_content(storage, names):
+    """
+    Forget the recorded conversions listing any of ``names`` whose files no
+    image row uses together any more, then delete the files among ``names``
+    that no remaining conversion lists.
+    """
+    ImageContent = apps.get_model('Images.ImageContent')
+    ImageContentFile = apps.get_model('Images.ImageContentFile')
+    image_models = [apps.get_model(label) for label in RESPONSIVE_IMAGE_MODELS]
+    for content in ImageContent.objects.filter(files__name__in=names).distinct():
+        files = variant_names(content.variants)
+        # Same converted image with other derivatives, e.g. after a widths
+        # change, does not keep this conversion's derivatives alive.
+        if not any(variant_names(variants) == files
+                   for model in image_models
+                   for variants in model.objects.filter(image=content.name)
+                   .values_list('image_variants', flat=True)):
+            content.delete()
+    listed = set(ImageContentFile.objects.filter(name__in=names).values_list('name', flat=True))
+    for name in set(names) - listed:
+        if any(model.objects.filter(image=name).exists() for model in image_models):
+            continue
+        if storage.exists(name):
+            storage.delete(name)
+
+
+def delete_image_files(field, variants):
+    """
+    Delete a stored image and all of its derivatives.
+    """
+    names = variant_names(variants)
+    if field:
+        names.add(field.name)
+    discard_files(field.storage, names)
+
+
+def convert_stored(storage, name):
+    """
+    Convert the stored file ``name`` to a bounded WebP, unless it already is
+    one within the bound, and render its derivatives. Returns the converted
+    file's name and the variant list; the source file is left in place.
+    """
+    with storage.open(name, 'rb') as fp:
+        img, source_format, source_size = decode_bounded(fp)
+        try:
+            if source_format != 'WEBP' or source_size != img.size:
+                name = save_webp(storage, f"{os.path.splitext(name)[0]}.webp", img)
+            elif settings.IMAGE_CONTENT_ADDRESSED:
+                name = save_content(storage, fp)
+            return name, render_derivatives(img, name, storage)
+        finally:
+            img.close()
+
+
+def find_conversion(storage, digest):
+    """
+    The ``(name, variants)`` recorded for an upload digest, if all of its
+    files are still stored.
+    """
+    content = apps.get_model('Images.ImageContent').objects.filter(source_digest=digest).first()
+    if content is None or not all(storage.exists(v['name']) for v in content.variants):
+        return None
+    return content.name, content.variants
+
+
+def convert_image(field):
+    """
+    ``convert_stored`` for a model's image. With IMAGE_CONTENT_ADDRESSED a
+    recorded conversion of the same bytes is reused, and a new one recorded.
+    """
+    if not settings.IMAGE_CONTENT_ADDRESSED:
+        return convert_stored(field.storage, field.name)
+    with field.storage.open(field.name, 'rb') as fp:
+        digest = source_digest(fp)
+    known = find_conversion(field.storage, digest)
+    if known is not None:
+        return known
+    name, variants = convert_stored(field.storage, field.name)
+    record_conversion(digest, name, variants)
+    return name, variants
+
+
+def apply_conversion(obj, name, variants):
+    """
+    Point ``obj`` at a converted image and delete the files it replaces: the
+    unconverted source and any derivatives no longer listed. Does not save.
+    """
+    field = obj.image
+    keep = variant_names(variants)
+    stale = variant_names(obj.image_variants) | {field.name}
+    discard_files(field.storage, stale - keep)
+    field.name = name
+    obj.image_variants = variants
+    obj.image_status = ImageStatus.READY
+
+
+def store_image(obj, title, previous=None):
+    """
+    Store a freshly uploaded ``obj.image`` under a name built from ``title``
+    and delete the files of ``previous``, the row as it was before this
+    upload. Does not save ``obj``.
+
+    The upload is kept as it is and marked pending; the caller queues the
+    conversion (``Images.jobs.enqueue_conversion``) once ``obj`` is saved.
+    Returns whether it has to. With IMAGE_JOBS_INLINE the image is converted
+    here instead and nothing needs queueing. With IMAGE_CONTENT_ADDRESSED an
+    upload converted before is not stored at all: ``obj`` points at the
+    existing files.
+    """
+    field = obj.image
+    known = None
+    if settings.IMAGE_CONTENT_ADDRESSED:
+        known = find_conversion(field.storage, source_digest(field.file))
+    if known is None:
+        ext = os.path.splitext(field.name)[1].lower()
+        field.save(f"{slugify(title)}-{uuid.uuid4().hex}{ext}", field.file, save=False)
+
+    if previous is not None and previous.image:
+        delete_image_files(previous.image, previous.image_variants)
+
+    if known is not None:
+        obj.image, obj.image_variants = known
+        obj.image_status = ImageStatus.READY
+        return False
+    obj.image_variants = []
+    if settings.IMAGE_JOBS_INLINE:
+        apply_conversion(obj, *convert_image(field))
+        return False
+    obj.image_status = ImageStatus.PENDING
+    return True
+
+
+def rebuild_derivatives(obj):
+    """
+    Convert an already stored ``obj.image`` again and save it (after a
+    change of IMAGE_DERIVATIVE_WIDTHS, or for rows stored before the
+    pipeline existed).
+    """
+    with transaction.atomic():
+        apply_conversion(obj, *convert_image(obj.image))
+        obj.save(update_fields=['image', 'image_variants', 'image_status', 'updated_at'])
+
+
+def srcset(field, variants):
+    """
+    ``[{'url', 'width'}, ...]`` for the stored variants, narrowest first;
+    empty for images stored before the pipeline existed.
+    """
+    if not field:
+        return []
+    return [{'url': field.storage.url(variant['name']), 'width': variant['width']}
+            for variant in variants or ()]
+
+
+def preview_url(field, variants):
+    """
+    URL of the smallest stored variant, for admin thumbnails.
+    """
+    if variants:
+        return field.storage.url(variants[0]['name'])
+    return field.url
@@ -1,14 +1,44 @@
+import hashlib
+import io
 import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
 
+from PIL import Image as PILImage
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
+from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
 from unittest import mock
 
-from Images.models import Image
+from Images.jobs import SUPERSEDED, claim_jobs, enqueue_conversion, requeue_stale, run_job
+from Images.models import Image, ImageContent, ImageContentFile, ImageJob
+from Images.pipeline import ImageStatus, decode_bounded, delete_image_files, store_image
+from Images.views import serve_immutable
 
-class ImagePropsTests(APITestCase):
+class TemporaryMediaMixin:
+    """
+    Store the uploads of a test class under a temporary MEDIA_ROOT instead
+    of the project's media/ directory.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        cls.addClassCleanup(settings_override.disable)
+
+
+class ImagePropsTests(TemporaryMediaMixin, APITestCase):
     def setUp(self):
         # Create a sample image file
         self.sample_file = SimpleUploadedFile(
@@ -61,4 +91,320 @@ class ImagePropsTests(APITestCase):
         img1.image.delete(save=False)
         img2.image.delete(save=False)
         img1.delete()
-        img2.delete()
\ No newline at end of file
+        img2.delete()
+
+def png_upload(width, height, name='photo.png', mode='RGB', color='red'):
+    buff = io.BytesIO()
+    PILImage.new(mode, (width, height), color).save(buff, format='PNG')
+    return SimpleUploadedFile(name=name, content=buff.getvalue(), content_type='image/png')
+
+
+@override_settings(IMAGE_DERIVATIVE_WIDTHS=[320, 640, 1280], IMAGE_JOBS_INLINE=True)
+class ImagePipelineTests(TemporaryMediaMixin, TestCase):
+
+    def store(self, width=1000, height=500, previous=None, **kwargs):
+        image = Image(name='Hero', alt='Hero', image=png_upload(width, height, **kwargs))
+        store_image(image, image.name, previous=previous)
+        image.save()
+        return image
+
+    def test_upload_gets_narrower_derivatives(self):
+        image = self.store()
+        self.assertTrue(image.image.name.startswith('images/hero-'))
+        self.assertTrue(image.image.name.endswith('.webp'))
+        self.assertEqual([(v['width'], v['height']) for v in image.image_variants],
+                         [(320, 160), (640, 320), (1000, 500)])
+        self.assertEqual(image.image_variants[-1]['name'], image.image.name)
+        for variant in image.image_variants:
+            with PILImage.open(image.image.storage.path(variant['name'])) as stored:
+                self.assertEqual(stored.format, 'WEBP')
+                self.assertEqual(stored.size, (variant['width'], variant['height']))
+                self.assertEqual(stored.mode, 'RGB')
+
+    def test_transparency_is_kept(self):
+        image = self.store(mode='RGBA', color=(255, 0, 0, 128))
+        with PILImage.open(image.image.path) as stored:
+            self.assertEqual(stored.mode, 'RGBA')
+
+    def test_small_upload_has_only_the_original(self):
+        image = self.store(width=200, height=100)
+        self.assertEqual(len(image.image_variants), 1)
+        self.assertEqual(image.image_srcset, [{'url': image.image.url, 'width': 200}])
+
+    def test_replacing_an_upload_deletes_the_old_files(self):
+        old = self.store()
+        old_names = [variant['name'] for variant in old.image_variants]
+        new = self.store(previous=Image.objects.get(pk=old.pk))
+        storage = new.image.storage
+        self.assertFalse(any(storage.exists(name) for name in old_names))
+        self.assertTrue(all(storage.exists(v['name']) for v in new.image_variants))
+
+    def test_api_and_admin_use_derivatives(self):
+        image = self.store()
+        response = self.client.get(reverse('image:image_list', kwargs={'name': image.name}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry['width'] for entry in response.data['srcset']], [320, 640, 1000])
+        self.assertEqual(response.data['srcset'][-1]['url'], image.image.url)
+        self.assertIn(image.image_variants[0]['name'], image.image_tag())
+
+    def test_build_command_backfills_existing_images(self):
+        image = Image.objects.create(name='legacy', image=png_upload(700, 350))
+        self.assertEqual(image.image_srcset, [])
+        self.assertEqual(image.image_tag().count(image.image.url), 1)
+
+        out = StringIO()
+        call_command('build_image_derivatives', stdout=out)
+        image.refresh_from_db()
+        self.assertEqual([v['width'] for v in image.image_variants], [320, 640, 700])
+        self.assertIn("Images.Image: 1 rebuilt, 0 failed", out.getvalue())
+
+        with override_settings(IMAGE_DERIVATIVE_WIDTHS=[500]):
+            call_command('build_image_derivatives', stdout=StringIO())
+            call_command('build_image_derivatives', rebuild_all=True, stdout=StringIO())
+        first = image.image_variants[0]['name']
+        image.refresh_from_db()
+        self.assertEqual([v['width'] for v in image.image_variants], [500, 700])
+        self.assertFalse(image.image.storage.exists(first))
+
+    @override_settings(IMAGE_MAX_DIMENSION=600)
+    def test_large_upload_is_bounded(self):
+        image = self.store(width=1500, height=900)
+        self.assertEqual([(v['width'], v['height']) for v in image.image_variants],
+                         [(320, 192), (600, 360)])
+        with PILImage.open(image.image.path) as stored:
+            self.assertEqual(stored.size, (600, 360))
+
+
+@override_settings(IMAGE_MAX_DIMENSION=500, IMAGE_MAX_PIXELS=4_000_000,
+                   IMAGE_MAX_UPLOAD_SIZE=2 ** 20)
+class ImageUploadLimitTests(TestCase):
+
+    def clean(self, upload):
+        Image(name='Hero', alt='Hero', image=upload).full_clean()
+
+    def test_upload_within_limits_is_valid(self):
+        self.clean(png_upload(1500, 1000))
+
+    def test_oversized_file_is_rejected(self):
+        upload = SimpleUploadedFile('big.png', b'0' * (2 ** 20 + 1), content_type='image/png')
+        with self.assertRaisesMessage(ValidationError, "larger than 1 MB"):
+            self.clean(upload)
+
+    def test_too_many_pixels_are_rejected_from_the_header(self):
+        upload = png_upload(3000, 2000)
+        with mock.patch.object(PILImage.Image, 'load') as load:
+            with self.assertRaisesMessage(ValidationError, "3000x2000 pixels"):
+                self.clean(upload)
+        load.assert_not_called()
+
+    def test_jpeg_is_decoded_at_reduced_scale(self):
+        buff = io.BytesIO()
+        PILImage.new('RGB', (2400, 1200), 'red').save(buff, format='JPEG')
+        buff.seek(0)
+        resampled_from = []
+        resize = PILImage.Image.resize
+
+        def record_resize(img, *args, **kwargs):
+            resampled_from.append(img.size)
+            return resize(img, *args, **kwargs)
+
+        with mock.patch.object(PILImage.Image, 'resize', record_resize):
+            img, source_format, source_size = decode_bounded(buff)
+        with img:
+            self.assertEqual((source_format, source_size), ('JPEG', (2400, 1200)))
+            self.assertEqual(img.size, (500, 250))
+            self.assertEqual(img.mode, 'RGB')
+        # Resampled from the 1/4 scale draft, not the full-size decode.
+        self.assertEqual(resampled_from, [(600, 300)])
+
+    def test_memory_benchmark_runs(self):
+        out = StringIO()
+        call_command('bench_image_memory', megapixels=1, formats=['jpeg'], stdout=out)
+        self.assertIn("sample-1mp.jpeg", out.getvalue())
+        self.assertIn("legacy", out.getvalue())
+        self.assertIn("pipeline", out.getvalue())
+
+
+@override_settings(IMAGE_DERIVATIVE_WIDTHS=[320], IMAGE_JOB_MAX_ATTEMPTS=2)
+class ImageJobTests(TemporaryMediaMixin, TestCase):
+    def upload(self, previous=None, upload=None):
+        image = previous or Image(name='Hero', alt='Hero')
+        image.image = upload or png_upload(800, 400)
+        queued = store_image(image, image.name, previous=previous and
+                             Image.objects.get(pk=previous.pk))
+        image.save()
+        self.assertTrue(queued)
+        enqueue_conversion(image)
+        return image
+
+    def test_upload_is_stored_as_is_and_converted_by_a_job(self):
+        image = self.upload()
+        source = image.image.name
+        self.assertTrue(source.endswith('.png'))
+        self.assertEqual(image.image_status, ImageStatus.PENDING)
+        self.assertEqual(image.image_srcset, [])
+
+        [job_id] = claim_jobs(5)
+        self.assertEqual(claim_jobs(5), [])
+        self.assertEqual(run_job(job_id), ImageJob.Status.DONE)
+
+        image.refresh_from_db()
+        self.assertEqual(image.image_status, ImageStatus.READY)
+        self.assertTrue(image.image.name.endswith('.webp'))
+        self.assertEqual([v['width'] for v in image.image_variants], [320, 800])
+        self.assertFalse(image.image.storage.exists(source))
+        job = ImageJob.objects.get(pk=job_id)
+        self.assertEqual((job.attempts, job.error), (1, ''))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_newer_upload_supersedes_queued_job(self):
+        image = self.upload()
+        first_job = ImageJob.objects.get()
+        image = self.upload(previous=image)
+        newer = image.image.name
+
+        ids = claim_jobs(5)
+        self.assertEqual(run_job(first_job.pk), ImageJob.Status.DONE)
+        self.assertEqual(ImageJob.objects.get(pk=first_job.pk).error, SUPERSEDED)
+        image.refresh_from_db()
+        self.assertEqual((image.image.name, image.image_status), (newer, ImageStatus.PENDING))
+
+        run_job(ids[1])
+        image.refresh_from_db()
+        self.assertEqual(image.image_status, ImageStatus.READY)
+
+    def test_broken_upload_is_retried_then_marked_failed(self):
+        broken = SimpleUploadedFile('broken.png', b'not an image', content_type='image/png')
+        image = self.upload(upload=broken)
+        for expected in (ImageJob.Status.PENDING, ImageJob.Status.FAILED):
+            [job_id] = claim_jobs(1)
+            self.assertEqual(run_job(job_id), expected)
+        self.assertIn('UnidentifiedImageError', ImageJob.objects.get().error)
+        image.refresh_from_db()
+        self.assertEqual(image.image_status, ImageStatus.FAILED)
+
+    @override_settings(IMAGE_JOB_TIMEOUT=60)
+    def test_lost_running_jobs_are_requeued(self):
+        self.upload()
+        [job_id] = claim_jobs(1)
+        self.assertEqual(requeue_stale(), 0)
+        ImageJob.objects.filter(pk=job_id).update(
+            started_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(requeue_stale(), 1)
+        self.assertEqual(claim_jobs(1), [job_id])
+
+    def test_worker_command_drains_the_queue(self):
+        self.upload()
+        out = StringIO()
+        call_command('process_image_jobs', in_process=True, once=True, stdout=out)
+        self.assertIn(": done", out.getvalue())
+        self.assertEqual(Image.objects.get().image_status, ImageStatus.READY)
+
+
+@override_settings(IMAGE_CONTENT_ADDRESSED=True, IMAGE_DERIVATIVE_WIDTHS=[320])
+class ContentAddressedStorageTests(TemporaryMediaMixin, TestCase):
+    def upload(self, name='Hero'):
+        image = Image(name=name, alt=name, image=png_upload(800, 400))
+        queued = store_image(image, image.name)
+        image.save()
+        if queued:
+            enqueue_conversion(image)
+            run_job(claim_jobs(1)[0])
+            image.refresh_from_db()
+        return image, queued
+
+    def delete(self, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_image_files(image.image, image.image_variants)
+            image.delete()
+
+    def test_files_are_named_by_content_hash(self):
+        image, _ = self.upload()
+        self.assertEqual(image.image_status, ImageStatus.READY)
+        for variant in image.image_variants:
+            self.assertTrue(variant['name'].startswith('content/'))
+            with image.image.storage.open(variant['name'], 'rb') as stored:
+                digest = hashlib.sha256(stored.read()).hexdigest()
+            self.assertEqual(os.path.basename(variant['name']), f"{digest}.webp")
+
+    def test_same_upload_reuses_the_stored_conversion(self):
+        first, queued = self.upload('Gallery')
+        self.assertTrue(queued)
+        second, queued = self.upload('Post')
+        self.assertFalse(queued)
+        self.assertEqual(ImageJob.objects.count(), 1)
+        self.assertEqual(second.image.name, first.image.name)
+        self.assertEqual(second.image_variants, first.image_variants)
+        self.assertEqual(second.image_status, ImageStatus.READY)
+        # Only the converted files are stored, the staged upload is gone.
+        self.assertEqual(sorted(os.listdir(os.path.join(first.image.storage.location, 'images'))), [])
+
+    def test_changed_settings_convert_again(self):
+        first, _ = self.upload()
+        with override_settings(IMAGE_DERIVATIVE_WIDTHS=[400]):
+            second, queued = self.upload()
+        self.assertTrue(queued)
+        self.assertEqual([v['width'] for v in second.image_variants], [400, 800])
+        self.assertEqual(ImageContent.objects.count(), 2)
+
+    def test_shared_files_are_kept_until_unused(self):
+        first, _ = self.upload()
+        second, _ = self.upload()
+        storage = first.image.storage
+        names = [variant['name'] for variant in first.image_variants]
+
+        self.delete(first)
+        self.assertTrue(all(storage.exists(name) for name in names))
+        self.assertTrue(ImageContent.objects.exists())
+
+        self.delete(second)
+        self.assertFalse(any(storage.exists(name) for name in names))
+        self.assertFalse(ImageContent.objects.exists())
+
+    def test_conversion_lists_its_files(self):
+        image, _ = self.upload()
+        self.assertEqual(set(ImageContentFile.objects.values_list('name', flat=True)),
+                         {variant['name'] for variant in image.image_variants})
+
+    def test_content_in_use_does_not_depend_on_variant_json(self):
+        first, _ = self.upload()
+        second, _ = self.upload()
+        # Same files, serialized with another key order.
+        Image.objects.filter(pk=first.pk).update(image_variants=[
+            {'height': v['height'], 'width': v['width'], 'name': v['name']}
+            for v in first.image_variants])
+
+        self.delete(second)
+        self.assertTrue(ImageContent.objects.exists())
+        self.assertTrue(all(first.image.storage.exists(v['name']) for v in first.image_variants))
+
+    def test_widths_change_releases_only_the_old_derivatives(self):
+        first, _ = self.upload()
+        with override_settings(IMAGE_DERIVATIVE_WIDTHS=[400]):
+            second, _ = self.upload()
+        storage = first.image.storage
+        self.assertEqual(second.image.name, first.image.name)
+
+        self.delete(first)
+        self.assertEqual(ImageContent.objects.count(), 1)
+        self.assertFalse(storage.exists(first.image_variants[0]['name']))
+        self.assertTrue(all(storage.exists(v['name']) for v in second.image_variants))
+
+    def test_rebuild_releases_replaced_derivatives(self):
+        image, _ = self.upload()
+        old = image.image_variants[0]['name']
+        with override_settings(IMAGE_DERIVATIVE_WIDTHS=[500]):
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command('build_image_derivatives', rebuild_all=True, stdout=StringIO())
+        image.refresh_from_db()
+        self.assertEqual([v['width'] for v in image.image_variants], [500, 800])
+        self.assertTrue(image.image.storage.exists(image.image.name))
+        self.assertFalse(image.image.storage.exists(old))
+
+    def test_content_is_served_immutable(self):
+        image, _ = self.upload()
+        path = image.image.name.removeprefix('content/')
+        response = serve_immutable(RequestFactory().get(image.image.url), path)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
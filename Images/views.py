@@ -1,14 +1,23 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from api.cache import conditional
+from api.renderers import JsonResponse
 from .models import Image
+from .pipeline import CONTENT_DIR
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
 
 
 class ImageProps(APIView):
 
     permission_classes = (permissions.AllowAny,)
+
+    @conditional(Image)
     def get(self, request, name=None):
         if not name:
             return Response({'error': 'Name is required'}, status=status.HTTP_400_BAD_REQUEST)
@@ -17,6 +26,7 @@ class ImageProps(APIView):
 
             data = {
                 'image': image.image.url,
+                'srcset': image.image_srcset,
                 'name': image.name,
                 'alt': image.alt
             }
@@ -28,4 +38,15 @@ class ImageProps(APIView):
         except Image.MultipleObjectsReturned:
             return JsonResponse({'error': 'Problem with database'} ,status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            return JsonResponse({'error': e} ,status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return JsonResponse({'error': e} ,status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def serve_immutable(request, path, **kwargs):
+    """
+    Serve a content-addressed media file. Its name is the hash of its bytes,
+    so it never changes and browsers and proxies may keep it for a year
+    without revalidating.
+    """
+    response = serve(request, f"{CONTENT_DIR}/{path}", document_root=settings.MEDIA_ROOT)
+    patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    return response
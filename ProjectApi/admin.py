@@ -1,12 +1,9 @@
-import io
 import os
-import uuid
 
-from PIL import Image as PILImage
 from django.contrib import admin
-from django.core.files.base import ContentFile
-from django.core.files.storage import default_storage
-from django.utils.text import slugify
+
+from Images.jobs import enqueue_conversion
+from Images.pipeline import store_image
 
 from .models import (
     ProjectCategory,
@@ -97,36 +94,19 @@ class ProjectAdmin(admin.ModelAdmin):
     get_status.short_description = 'Status'
 
     def save_model(self, request, obj, form, change):
+        queued = False
         if 'image' in form.changed_data and obj.image:
-            old_name = None
+            old_obj = None
             if change:  # obj.pk exists and we're updating
                 old_obj = self.model.objects.filter(pk=obj.pk).first()
-                if old_obj and old_obj.image:
-                    old_name = old_obj.image.name
 
             # File name
             base, ext = os.path.splitext(obj.image.name)
 
-            obj.name = obj.title or base
-            slug = slugify(obj.title)
-            new_name = f"{slug}-{uuid.uuid4().hex}.webp"
-
-            if ext != '.webp':
-                img = PILImage.open(obj.image)
-                img = img.convert('RGBA')
-                buff = io.BytesIO()
-                img.save(buff, format='WEBP', quality=85, method=6)
-                buff.seek(0)
-                obj.image.save(new_name, ContentFile(buff.read()), save=False)
-                img.close()
-            else:
-                obj.image.storage.save(new_name, obj.image.file)
-
-            if old_name and default_storage.exists(old_name):
-                default_storage.delete(old_name)
-
-            obj.image.name = new_name
+            queued = store_image(obj, obj.title or base, previous=old_obj)
         super().save_model(request, obj, form, change)
+        if queued:
+            enqueue_conversion(obj)
 
 
 @admin.register(ProjectCategory)
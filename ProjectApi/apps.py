@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ProjectapiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ProjectApi'
+
+    def ready(self):
+        from ProjectApi import signals  # noqa: F401
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 01:24
+
+import Images.pipeline
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ProjectApi', '0007_image_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='project',
+            name='image',
+            field=models.ImageField(upload_to='project/', validators=[Images.pipeline.validate_image_upload]),
+        ),
+    ]
@@ -3,6 +3,7 @@ from django.db import models
 from django.utils.html import format_html
 from django.utils.text import slugify
 
+from Images.pipeline import ImageStatus, preview_url, srcset, validate_image_upload
 from api.models import IconsClass
 
 class ProjectCategory(models.Model):
@@ -13,6 +14,7 @@ class ProjectCategory(models.Model):
     icon = models.ForeignKey(IconsClass, on_delete=models.SET_NULL,
                              null=True, blank=True)
     short = models.CharField(max_length=30, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
 
     def __str__(self):
@@ -27,6 +29,7 @@ class ProjectTechnology(models.Model):
     icon = models.ForeignKey(IconsClass, on_delete=models.SET_NULL,
                              null=True, blank=True)
     name = models.CharField(max_length=200, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -38,7 +41,10 @@ class Project(models.Model):
     """
     title = models.CharField(max_length=100)
     description = models.TextField()
-    image = models.ImageField(upload_to='project/')
+    image = models.ImageField(upload_to='project/', validators=[validate_image_upload])
+    image_variants = models.JSONField(default=list, blank=True, editable=False)
+    image_status = models.CharField(max_length=10, choices=ImageStatus.choices,
+                                    default=ImageStatus.READY, editable=False)
     category = models.ManyToManyField(ProjectCategory)
     feathered = models.BooleanField(default=False)
     main_technologies = models.ManyToManyField(ProjectTechnology,
@@ -46,6 +52,7 @@ class Project(models.Model):
     github_url = models.URLField(null=True, blank=True)
     demo_url = models.URLField(null=True, blank=True)
     documents_url = models.URLField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
@@ -53,11 +60,15 @@ class Project(models.Model):
     @admin.display
     def image_tag(self):
         return format_html('<img src="{}" height="100" />',
-                           self.image.url)
+                           preview_url(self.image, self.image_variants))
 
     image_tag.short_description = 'Image'
     image_tag.allow_tags = True
 
+    @property
+    def image_srcset(self):
+        return srcset(self.image, self.image_variants)
+
 class ProjectDetail(models.Model):
     """
     Model for project details.
@@ -71,6 +82,7 @@ class ProjectDetail(models.Model):
     full_technologies = models.ManyToManyField(ProjectTechnology,
                                                related_name='full_technologies', blank=True)
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True)
 
 class ProjectGallery(models.Model):
     """
@@ -79,6 +91,7 @@ class ProjectGallery(models.Model):
     alternative_text = models.CharField(max_length=200)
     image = models.ImageField(upload_to='project_gallery/')
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True)
 
     @admin.display
     def image_tag(self):
@@ -94,6 +107,7 @@ class KeyFeatures(models.Model):
     """
     name = models.CharField(max_length=200)
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
\ No newline at end of file
@@ -0,0 +1,31 @@
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from ProjectApi.models import Project, ProjectCategory
+from ProjectApi.untils import CATEGORY_COUNTS_CACHE_KEY
+from api.models import IconsClass
+
+
+def invalidate_after_commit(using):
+    # After commit: a request reading the old rows before then would cache
+    # them again.
+    transaction.on_commit(partial(cache.delete, CATEGORY_COUNTS_CACHE_KEY), using=using)
+
+
+@receiver(m2m_changed, sender=Project.category.through)
+def invalidate_on_project_categories_change(sender, action, using, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_after_commit(using)
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=ProjectCategory)
+@receiver(post_delete, sender=ProjectCategory)
+@receiver(post_save, sender=IconsClass)
+@receiver(post_delete, sender=IconsClass)
+def invalidate_category_project_counts(sender, using, **kwargs):
+    invalidate_after_commit(using)
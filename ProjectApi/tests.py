@@ -1,14 +1,21 @@
+import json
+
+from asgiref.sync import sync_to_async
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 
 from .models import *
+from Images.tests import TemporaryMediaMixin
+from ProjectApi.untils import CATEGORY_COUNTS_CACHE_KEY
+from ProjectApi.views import AsyncProjectDetailEndpoint, ProjectDetailEndpoint
 from api.models import IconsClass
 
-class ProjectViewsTest(TestCase):
+class ProjectViewsTest(TemporaryMediaMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         self.icon = IconsClass.objects.create(
@@ -87,15 +94,31 @@ class ProjectViewsTest(TestCase):
         self.assertEqual(response.data[0]['title'], "Test Project")
         self.assertEqual(response.data[0]['featured'], True)
 
+    def test_projects_list_query_count_is_constant(self):
+        for i in range(10):
+            project = Project.objects.create(title=f"Project {i}", description="D",
+                                             image="project/p.webp")
+            project.category.add(self.category)
+            project.main_technologies.add(self.tech1, self.tech2)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(self.projects)
+        self.assertEqual(len(response.data), 11)
+        details = {item['title']: item['project_details'] for item in response.data}
+        self.assertTrue(details["Test Project"])
+        self.assertFalse(details["Project 0"])
+        self.assertEqual(len(response.data[0]['technologies']), 2)
+
     def test_get_project_detail(self):
         pk = self.project.pk
         url = self.projects_detail(pk)
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['title'], "Test Project")
-        self.assertEqual(response.data['project_details']['role'], "Developer")
-        self.assertEqual(response.data['project_details']['key_features'], ["Feature 1"])
-        self.assertEqual(response.data['project_details']['full_tech_stack'][0]['name'], "Django")
+        data = response.json()
+        self.assertEqual(data['title'], "Test Project")
+        self.assertEqual(data['project_details']['role'], "Developer")
+        self.assertEqual(data['project_details']['key_features'], ["Feature 1"])
+        self.assertEqual(data['project_details']['full_tech_stack'][0]['name'], "Django")
 
     def test_get_project_detail_not_found(self):
         response = self.client.get('/projects/999/')  # Non-existent ID
@@ -107,3 +130,108 @@ class ProjectViewsTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['countOfProject'], 1)
+
+
+class ProjectCategoryQueryTests(TestCase):
+    def setUp(self):
+        cache.delete(CATEGORY_COUNTS_CACHE_KEY)
+        self.client = APIClient()
+        self.categories = [
+            ProjectCategory.objects.create(
+                category_name=f"Category {i}",
+                icon=IconsClass.objects.create(name=f"Icon {i}", class_name=f"icon-{i}"),
+            ) for i in range(4)
+        ]
+        for i, category in enumerate(self.categories):
+            for j in range(i):
+                project = Project.objects.create(title=f"Project {i}-{j}",
+                                                 description="D", image="project/p.webp")
+                project.category.add(category)
+        self.cat = reverse('projects:project-category')
+
+    def tearDown(self):
+        cache.delete(CATEGORY_COUNTS_CACHE_KEY)
+
+    def test_categories_use_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.cat)
+        self.assertEqual({c['short']: (c['countOfProject'], c['icon']) for c in response.data},
+                         {c.short: (i, f"icon-{i}") for i, c in enumerate(self.categories)})
+
+    @override_settings(PROJECT_CATEGORY_COUNTS_CACHE=True)
+    def test_cached_categories_are_invalidated_by_m2m_change(self):
+        self.client.get(self.cat)
+        with self.assertNumQueries(0):
+            self.client.get(self.cat)
+
+        project = Project.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            project.category.add(self.categories[0])
+            # Invalidated only once the write commits.
+            self.assertIsNotNone(cache.get(CATEGORY_COUNTS_CACHE_KEY))
+        response = self.client.get(self.cat)
+        counts = {c['short']: c['countOfProject'] for c in response.data}
+        self.assertEqual(counts[self.categories[0].short], 1)
+
+
+class AsyncProjectDetailTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        icon = IconsClass.objects.create(name="Django", class_name="django-icon")
+        category = ProjectCategory.objects.create(category_name="Web", icon=icon)
+        tech = ProjectTechnology.objects.create(icon=icon, name="Django")
+        other = ProjectTechnology.objects.create(name="Redis")
+        self.project = Project.objects.create(title="Project", description="A\nB",
+                                              image="project/p.webp")
+        self.project.category.add(category)
+        self.project.main_technologies.add(tech)
+        details = ProjectDetail.objects.create(full_description="Full", role="Dev",
+                                               start_date=timezone.now().date(),
+                                               project=self.project)
+        details.full_technologies.add(tech, other)
+        KeyFeatures.objects.create(name="Fast", project=self.project)
+        ProjectGallery.objects.create(alternative_text="Shot", image="project_gallery/g.webp",
+                                      project=self.project)
+        # A second project sharing a technology must not leak into the first.
+        self.second = Project.objects.create(title="Second", description="C",
+                                             image="project/s.webp")
+        self.second.main_technologies.add(other)
+        ProjectDetail.objects.create(full_description="Other", role="Lead",
+                                     start_date=timezone.now().date(),
+                                     project=self.second).full_technologies.add(other)
+        self.bare = Project.objects.create(title="Bare", description="D",
+                                           image="project/b.webp")
+        self.factory = RequestFactory()
+
+    async def get_both(self, project_id):
+        path = reverse('projects:project-detail', kwargs={'project_id': project_id})
+        expected = await sync_to_async(ProjectDetailEndpoint.as_view())(
+            self.factory.get(path), project_id=project_id)
+        response = await AsyncProjectDetailEndpoint.as_view()(self.factory.get(path),
+                                                              project_id=project_id)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        return response
+
+    async def test_async_detail_matches_sync_detail(self):
+        response = await self.get_both(self.project.pk)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        payload = json.loads(response.content)
+        self.assertEqual(payload['project_details']['full_tech_stack'],
+                         [{'name': 'Django', 'icon': 'django-icon'}, {'name': 'Redis', 'icon': ''}])
+        second = json.loads((await self.get_both(self.second.pk)).content)
+        self.assertEqual(second['technologies'], [{'name': 'Redis', 'icon': ''}])
+        self.assertEqual(second['project_details']['full_tech_stack'],
+                         [{'name': 'Redis', 'icon': ''}])
+
+    async def test_missing_project_or_details_return_404(self):
+        for project_id in (0, self.bare.pk):
+            response = await self.get_both(project_id)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_sync_detail_is_cached(self):
+        path = reverse('projects:project-detail', kwargs={'project_id': self.project.pk})
+        self.client.get(path)
+        with self.assertNumQueries(0):
+            response = self.client.get(path)
+        self.assertEqual(response.json()['title'], "Project")
@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from ProjectApi.models import (KeyFeatures, Project, ProjectCategory, ProjectDetail,
+                               ProjectGallery, ProjectTechnology)
+
+CATEGORY_COUNTS_CACHE_KEY = 'projects:category-project-counts'
+
+
+def category_project_counts():
+    """
+    Project categories with their icon joined and project count annotated,
+    in a single query.
+    """
+    categories = (ProjectCategory.objects
+                  .select_related('icon')
+                  .annotate(project_count=Count('project')))
+    return [
+        {
+            'name': category.category_name,
+            'short': category.short,
+            'icon': category.icon.class_name if category.icon else "",
+            'countOfProject': category.project_count,
+        } for category in categories
+    ]
+
+
+def cached_category_project_counts():
+    """
+    ``category_project_counts`` served from the cache until a project,
+    category or icon change drops the entry.
+    """
+    data = cache.get(CATEGORY_COUNTS_CACHE_KEY)
+    if data is None:
+        data = category_project_counts()
+        cache.set(CATEGORY_COUNTS_CACHE_KEY, data, settings.PAGE_CACHE_TIME)
+    return data
+
+
+def project_technologies_queryset():
+    return ProjectTechnology.objects.select_related('icon')
+
+
+def project_detail_loaders(project_id):
+    """
+    Independent loaders of the rows a project detail response is built from,
+    in ``project_detail_payload`` argument order. Each filters by the project
+    id alone, so they can run one after another or concurrently.
+    """
+    return (
+        lambda: Project.objects.get(pk=project_id),
+        lambda: ProjectDetail.objects.get(project_id=project_id),
+        lambda: list(ProjectCategory.objects.filter(project=project_id)),
+        lambda: list(project_technologies_queryset().filter(main_technologies=project_id)),
+        lambda: list(KeyFeatures.objects.filter(project_id=project_id)),
+        lambda: list(ProjectGallery.objects.filter(project_id=project_id)),
+        # ProjectDetail.objects.get() above guarantees a single detail row.
+        lambda: list(project_technologies_queryset()
+                     .filter(full_technologies__project_id=project_id)),
+    )
+
+
+def project_detail_payload(project, details, categories, technologies,
+                           key_features, gallery, full_technologies):
+    """
+    Serialize a project and its already loaded detail rows.
+    """
+    return {
+        'id': project.pk,
+        'title': project.title,
+        'description': [x for x in project.description.split('\n')],
+        'image': project.image.url,
+        'image_srcset': project.image_srcset,
+        'category': [cat.category_name for cat in categories],
+        'featured': project.feathered,
+        'technologies': [
+            {
+                'name': tech.name, 'icon': tech.icon.class_name if tech.icon else ""
+            } for tech in technologies
+        ],
+        'github': project.github_url,
+        'demo': project.demo_url,
+        'documentation': project.documents_url,
+        'project_details': {
+            'descriptions': details.full_description.split('\n'),
+            'start_date': details.start_date.strftime('%d/%m/%Y'),
+            'end_date': details.end_date.strftime('%d/%m/%Y') if details.end_date is not None else None,
+            'date_format': '%d/%m/%Y',
+            'role': details.role,
+            'client': details.client,
+            'key_features': [feature.name for feature in key_features],
+            'gallery': [image.image.url for image in gallery],
+            'full_tech_stack': [
+                {
+                    'name': tech.name,
+                    'icon': tech.icon.class_name if tech.icon else "",
+                } for tech in full_technologies
+            ]
+        }
+    }
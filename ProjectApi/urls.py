@@ -1,6 +1,10 @@
+from django.conf import settings
 from django.urls import path
 from .views import *
 
+if settings.ASYNC_READ_VIEWS:
+    ProjectDetailEndpoint = AsyncProjectDetailEndpoint
+
 app_name = "projects"
 
 urlpatterns = [
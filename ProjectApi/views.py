@@ -1,13 +1,28 @@
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Prefetch
+from django.http import HttpResponse
+from django.views import View
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from BlogApi.models import Category
 from ProjectApi.models import *
+from ProjectApi.untils import (category_project_counts, cached_category_project_counts,
+                               project_detail_loaders, project_detail_payload)
+from api.cache import conditional, versioned_cache
+from api.renderers import JsonResponse
+from api.untils import gather_queries
+
+# Models a project detail response is built from.
+PROJECT_DETAIL_MODELS = (Project, ProjectDetail, ProjectCategory, ProjectTechnology,
+                         KeyFeatures, ProjectGallery, IconsClass)
 
 
 class ProjectsEndpoint(APIView):
     permission_classes = (permissions.AllowAny,)
+
+    @conditional(Project, ProjectCategory, ProjectTechnology, ProjectDetail, IconsClass)
     def get(self, request):
         cat = request.GET.get('cat')
         try:
@@ -15,7 +30,17 @@ class ProjectsEndpoint(APIView):
 
             if cat:
                 projects = projects.filter(category__short=cat)
-            projects = projects.all()
+
+            # Two batched prefetches (icons joined) and an EXISTS flag keep
+            # the listing at a fixed number of queries.
+            projects = projects.prefetch_related(
+                Prefetch('category',
+                         queryset=ProjectCategory.objects.select_related('icon')),
+                Prefetch('main_technologies',
+                         queryset=ProjectTechnology.objects.select_related('icon')),
+            ).annotate(
+                has_details=Exists(ProjectDetail.objects.filter(project=OuterRef('pk')))
+            )
 
             data = [
                 {
@@ -23,21 +48,22 @@ class ProjectsEndpoint(APIView):
                     'title': project.title,
                     'description': project.description,
                     'image': project.image.url,
+                    'image_srcset': project.image_srcset,
                     'category': [{
                         'name': cat.category_name,
                         'short': cat.short,
-                        'icon': cat.icon.class_name,
+                        'icon': cat.icon.class_name if cat.icon else "",
                     }for cat in project.category.all()],
                     'featured': project.feathered,
                     'technologies': [
                         {
-                            'name': tech.name, 'icon': tech.icon.class_name
+                            'name': tech.name, 'icon': tech.icon.class_name if tech.icon else ""
                         } for tech in project.main_technologies.all()
                     ],
                     'github': project.github_url,
                     'demo': project.demo_url,
                     'documentation': project.documents_url,
-                    'project_details': ProjectDetail.objects.get(project=project) is not None
+                    'project_details': project.has_details
                 } for project in projects
             ]
 
@@ -49,66 +75,45 @@ class ProjectsEndpoint(APIView):
 
 class ProjectDetailEndpoint(APIView):
     permission_classes = (permissions.AllowAny,)
+
+    @conditional(*PROJECT_DETAIL_MODELS)
+    @versioned_cache(*PROJECT_DETAIL_MODELS)
     def get(self, request, project_id):
         try:
-            project = Project.objects.get(pk=project_id)
-            project_details = ProjectDetail.objects.get(project=project)
-
-            data = {
-                'id': project.pk,
-                'title': project.title,
-                'description': [x for x in project.description.split('\n')],
-                'image': project.image.url,
-                'category': [cat.category_name for cat in project.category.all()],
-                'featured': project.feathered,
-                'technologies': [
-                    {
-                        'name': tech.name, 'icon': tech.icon.class_name
-                    } for tech in project.main_technologies.all()
-                ],
-                'github': project.github_url,
-                'demo': project.demo_url,
-                'documentation': project.documents_url,
-                'project_details': {
-                    'descriptions': project_details.full_description.split('\n'),
-                    'start_date': project_details.start_date.strftime('%d/%m/%Y'),
-                    'end_date': project_details.end_date.strftime('%d/%m/%Y') if project_details.end_date is not None else None,
-                    'date_format': '%d/%m/%Y',
-                    'role': project_details.role,
-                    'client': project_details.client,
-                    'key_features': [
-                       feature.name for feature in KeyFeatures.objects.filter(project=project).all()
-                    ],
-                    'gallery': [
-                       image.image.url for image in ProjectGallery.objects.filter(project=project).all()
-                    ],
-                    'full_tech_stack': [
-                        {
-                            'name': tech.name,
-                            'icon': tech.icon.class_name,
-                        } for tech in project_details.full_technologies.all()
-                    ]
-                }
-            }
+            rows = [load() for load in project_detail_loaders(project_id)]
+        except (Project.DoesNotExist, ProjectDetail.DoesNotExist):
+            return HttpResponse(status=status.HTTP_404_NOT_FOUND)
 
-            return Response(data, status=status.HTTP_200_OK)
+        return JsonResponse(project_detail_payload(*rows), status=status.HTTP_200_OK)
+
+
+class AsyncProjectDetailEndpoint(View):
+    """
+    ``ProjectDetailEndpoint`` for ASGI: the project and all of its detail
+    rows are loaded concurrently.
+    """
+
+    @conditional(*PROJECT_DETAIL_MODELS)
+    @versioned_cache(*PROJECT_DETAIL_MODELS)
+    async def get(self, request, project_id):
+        try:
+            rows = await gather_queries(*project_detail_loaders(project_id))
+        except (Project.DoesNotExist, ProjectDetail.DoesNotExist):
+            return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+
+        return JsonResponse(project_detail_payload(*rows), status=status.HTTP_200_OK)
 
-        except Project.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
 
 class ProjectCategoryEndpoint(APIView):
     permission_classes = (permissions.AllowAny,)
+
+    @conditional(ProjectCategory, Project, IconsClass)
     def get(self, request):
         try:
-            cat = ProjectCategory.objects.all()
-            data = [
-                {
-                    'name': category.category_name,
-                    'short': category.short,
-                    'icon': category.icon.class_name if category.icon else "",
-                    'countOfProject': Project.objects.filter(category=category).count(),
-                } for category in cat
-            ]
+            if settings.PROJECT_CATEGORY_COUNTS_CACHE:
+                data = cached_category_project_counts()
+            else:
+                data = category_project_counts()
 
             return Response(data, status=status.HTTP_200_OK)
         except Category.DoesNotExist:
@@ -0,0 +1,107 @@
+"""
+Redis cache backend with native async methods.
+
+Django's ``RedisCache`` implements ``aget``/``aset``/... by running the sync
+client through ``sync_to_async(thread_sensitive=True)``, so every async
+cache call of an ASGI worker queues on one thread. ``AsyncRedisCache`` sends
+the calls the async views use over ``redis.asyncio`` instead; the rest keep
+the inherited fallback.
+"""
+import asyncio
+import weakref
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.redis import RedisCache, RedisCacheClient
+
+
+class AsyncRedisCacheClient(RedisCacheClient):
+    def __init__(self, servers, **options):
+        super().__init__(servers, **options)
+        import redis.asyncio
+
+        self._async_lib = redis.asyncio
+        # Async connections belong to the event loop that opened them.
+        self._async_pools = weakref.WeakKeyDictionary()
+        # The sync parser does not work on async connections, redis.asyncio
+        # picks its own (hiredis when installed).
+        self._async_pool_options = {
+            name: value for name, value in self._pool_options.items()
+            if name != 'parser_class'
+        }
+
+    def _get_async_connection_pool(self, write):
+        index = self._get_connection_pool_index(write)
+        pools = self._async_pools.setdefault(asyncio.get_running_loop(), {})
+        if index not in pools:
+            pools[index] = self._async_lib.ConnectionPool.from_url(
+                self._servers[index],
+                **self._async_pool_options,
+            )
+        return pools[index]
+
+    def get_async_client(self, key=None, *, write=False):
+        pool = self._get_async_connection_pool(write)
+        return self._async_lib.Redis(connection_pool=pool)
+
+    async def aadd(self, key, value, timeout):
+        client = self.get_async_client(key, write=True)
+        value = self._serializer.dumps(value)
+
+        if timeout == 0:
+            if ret := bool(await client.set(key, value, nx=True)):
+                await client.delete(key)
+            return ret
+        return bool(await client.set(key, value, ex=timeout, nx=True))
+
+    async def aget(self, key, default):
+        client = self.get_async_client(key)
+        value = await client.get(key)
+        return default if value is None else self._serializer.loads(value)
+
+    async def aset(self, key, value, timeout):
+        client = self.get_async_client(key, write=True)
+        value = self._serializer.dumps(value)
+        if timeout == 0:
+            await client.delete(key)
+        else:
+            await client.set(key, value, ex=timeout)
+
+    async def adelete(self, key):
+        client = self.get_async_client(key, write=True)
+        return bool(await client.delete(key))
+
+    async def aget_many(self, keys):
+        client = self.get_async_client(None)
+        ret = await client.mget(keys)
+        return {
+            k: self._serializer.loads(v) for k, v in zip(keys, ret) if v is not None
+        }
+
+
+class AsyncRedisCache(RedisCache):
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self._class = AsyncRedisCacheClient
+
+    async def aadd(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return await self._cache.aadd(key, value, self.get_backend_timeout(timeout))
+
+    async def aget(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return await self._cache.aget(key, default)
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        await self._cache.aset(key, value, self.get_backend_timeout(timeout))
+
+    async def adelete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return await self._cache.adelete(key)
+
+    async def aget_many(self, keys, version=None):
+        key_map = {
+            self.make_and_validate_key(key, version=version): key for key in keys
+        }
+        ret = await self._cache.aget_many(list(key_map))
+        return {key_map[k]: v for k, v in ret.items()}
@@ -0,0 +1,58 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import reverse
+
+from SecCodeSmithBackend.routers import replica_reads
+
+PIN_COOKIE = 'db_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaPinningMiddleware:
+    """
+    Let public read requests use the read replica, except for clients that
+    wrote within the last ``REPLICA_PIN_SECONDS``: those are pinned to the
+    primary by a short-lived cookie so they read their own writes.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with replica_reads(self.use_replica(request)) as state:
+            response = self.get_response(request)
+        return self.pin(request, response, state)
+
+    async def __acall__(self, request):
+        with replica_reads(self.use_replica(request)) as state:
+            response = await self.get_response(request)
+        return self.pin(request, response, state)
+
+    def use_replica(self, request):
+        if request.method not in SAFE_METHODS:
+            return False
+        if request.path.startswith(reverse('admin:index')):
+            return False
+        try:
+            pinned_until = float(request.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        return pinned_until < time.time()
+
+    def pin(self, request, response, state):
+        wrote = state.wrote or (request.method not in SAFE_METHODS
+                                and response.status_code < 400)
+        if wrote and settings.REPLICA_PIN_SECONDS > 0:
+            response.set_cookie(
+                PIN_COOKIE, f"{time.time() + settings.REPLICA_PIN_SECONDS:.3f}",
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,162 @@
+"""
+Primary/replica database routing.
+
+Reads go to the replica only inside a ``replica_reads()`` block, which
+``ReplicaPinningMiddleware`` opens for public GET requests from clients that
+have not written recently. Everything else - writes, admin, management
+commands, signal handlers - uses the primary. The replica is skipped while it
+is unreachable or lags behind by more than ``REPLICA_MAX_LAG`` seconds.
+Responses shared between clients are built inside ``primary_reads()`` while
+their models changed within that time (``api.cache.versioned_cache``), so a
+cache entry keyed with a new version never holds rows the replica has not
+replayed yet.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# PostgreSQL standby lag in seconds; 0 while everything received is replayed,
+# otherwise the age of the last replayed transaction.
+POSTGRES_LAG_QUERY = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class RoutingState:
+    __slots__ = ('replica', 'wrote')
+
+    def __init__(self, replica):
+        self.replica = replica
+        self.wrote = False
+
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """
+    Route reads in this context to the replica when ``enabled``. The yielded
+    state records whether anything was written through the router.
+    """
+    state = RoutingState(enabled)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+def reads_replica():
+    """
+    Whether reads in the current context may go to the replica.
+    """
+    state = _state.get()
+    return state is not None and state.replica
+
+
+@contextmanager
+def primary_reads():
+    """
+    Route reads in this context to the primary, for responses that must not
+    miss a commit the replica has not replayed yet.
+    """
+    state = _state.get()
+    if state is None or not state.replica:
+        yield
+        return
+    state.replica = False
+    try:
+        yield
+    finally:
+        # A write inside the block keeps the rest of the request on the primary.
+        state.replica = not state.wrote
+
+
+def replica_lag(connection):
+    """
+    Seconds the replica is behind the primary, or 0 when the backend cannot
+    tell (SQLite).
+    """
+    if connection.vendor != 'postgresql':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRES_LAG_QUERY)
+        return float(cursor.fetchone()[0] or 0)
+
+
+class ReplicaHealth:
+    """
+    Per-process cache of whether the replica is usable, re-checked at most
+    every ``REPLICA_CHECK_INTERVAL`` seconds.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked = {}
+
+    def check(self, alias):
+        try:
+            connection = connections[alias]
+            connection.ensure_connection()
+            return replica_lag(connection) <= settings.REPLICA_MAX_LAG
+        except DatabaseError:
+            return False
+
+    def available(self, alias):
+        now = time.monotonic()
+        checked_at, usable = self.checked.get(alias, (None, False))
+        if checked_at is not None and now - checked_at < settings.REPLICA_CHECK_INTERVAL:
+            return usable
+        # One thread re-checks; the others keep the previous answer, or use
+        # the primary if there is none yet.
+        if not self.lock.acquire(blocking=False):
+            return usable
+        try:
+            usable = self.check(alias)
+            self.checked[alias] = (time.monotonic(), usable)
+        finally:
+            self.lock.release()
+        return usable
+
+    def reset(self):
+        self.checked.clear()
+
+
+replica_health = ReplicaHealth()
+
+
+class ReplicaRouter:
+    """
+    Send reads to ``settings.REPLICA_DATABASE`` inside ``replica_reads()``
+    while the replica is healthy, and all writes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        alias = settings.REPLICA_DATABASE
+        if state is None or not state.replica or alias not in settings.DATABASES:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Read inside a transaction on the primary: stay there.
+            return DEFAULT_DB_ALIAS
+        return alias if replica_health.available(alias) else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+            # Reads after a write in the same request must see it.
+            state.replica = False
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
@@ -13,12 +13,27 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 env = environ.Env(
     DEBUG=(bool, False),
+    BROWSABLE_API=(bool, False),
     DATABASE_TYPE=(str, 'pgsql'),
     DATABASE_USER=(str, 'postgres'),
     DATABASE_PASSWORD=(str, 'postgres'),
     DATABASE_HOST=(str, 'localhost'),
     DATABASE_PORT=(int, '5432'),
     DATABASE_NAME=(str, 'backend'),
+    DATABASE_CONN_MAX_AGE=(int, 60),
+    DATABASE_CONN_HEALTH_CHECKS=(bool, True),
+    DATABASE_POOL=(bool, False),
+    DATABASE_POOL_MIN_SIZE=(int, 2),
+    DATABASE_POOL_MAX_SIZE=(int, 8),
+    DATABASE_POOL_TIMEOUT=(float, 10.0),
+    DATABASE_POOL_MAX_IDLE=(float, 300.0),
+    DATABASE_POOL_MAX_LIFETIME=(float, 3600.0),
+    DATABASE_REPLICA_HOST=(str, ''),
+    DATABASE_REPLICA_PORT=(int, 0),
+    DATABASE_REPLICA_NAME=(str, ''),
+    REPLICA_PIN_SECONDS=(int, 5),
+    REPLICA_MAX_LAG=(float, 5.0),
+    REPLICA_CHECK_INTERVAL=(float, 5.0),
     EMAIL_HOST=(str, ''),
     EMAIL_USER=(str, ''),
     EMAIL_PASSWORD=(str, ''),
@@ -30,7 +45,39 @@ env = environ.Env(
     REDIS_PORT=(int, 6379),
     REDIS_DB=(int, 0),
     REDIS_PASSWORD=(str, ''),
-    PAGE_CACHE_TIME=(int, 60),
+    PAGE_CACHE_TIME=(int, 3600),
+    PAGE_CACHE_JITTER=(float, 0.1),
+    PAGE_CACHE_STALE_TIME=(int, 300),
+    PAGE_CACHE_LOCK_TIMEOUT=(int, 10),
+    PAGE_CACHE_EARLY_REFRESH_BETA=(float, 1.0),
+    PAGE_CACHE_COMPRESS_MIN_LENGTH=(int, 200),
+    PAGE_CACHE_GZIP_LEVEL=(int, 9),
+    PAGE_CACHE_BROTLI_QUALITY=(int, 11),
+    BLOG_CATEGORY_COUNTS_CACHE=(bool, False),
+    PROJECT_CATEGORY_COUNTS_CACHE=(bool, False),
+    POST_SEARCH_CONFIG=(str, 'english'),
+    JSON_BACKEND=(str, 'orjson'),
+    ASYNC_READ_VIEWS=(bool, False),
+    SERVER_INTERFACE=(str, 'wsgi'),
+    SERVER_BIND=(str, '0.0.0.0:8000'),
+    SERVER_WORKERS=(int, 0),
+    SERVER_THREADS=(int, 4),
+    SERVER_PRELOAD=(bool, True),
+    SERVER_MAX_REQUESTS=(int, 1000),
+    SERVER_MAX_REQUESTS_JITTER=(int, 100),
+    SERVER_KEEPALIVE=(int, 5),
+    SERVER_TIMEOUT=(int, 30),
+    SERVER_GRACEFUL_TIMEOUT=(int, 30),
+    IMAGE_DERIVATIVE_WIDTHS=(list, [320, 640, 960, 1280, 1920]),
+    IMAGE_WEBP_QUALITY=(int, 85),
+    IMAGE_JOBS_INLINE=(bool, False),
+    IMAGE_WORKER_PROCESSES=(int, 0),
+    IMAGE_JOB_MAX_ATTEMPTS=(int, 3),
+    IMAGE_JOB_TIMEOUT=(int, 600),
+    IMAGE_MAX_DIMENSION=(int, 3840),
+    IMAGE_MAX_PIXELS=(int, 60_000_000),
+    IMAGE_MAX_UPLOAD_SIZE=(int, 30 * 2 ** 20),
+    IMAGE_CONTENT_ADDRESSED=(bool, False),
 )
 
 environ.Env.read_env(os.path.join(BASE_DIR, '.env'))
@@ -122,8 +169,26 @@ if env('DATABASE_TYPE') == 'pgsql':
             'PASSWORD': env('DATABASE_PASSWORD'),
             'HOST': env('DATABASE_HOST'),
             'PORT': env('DATABASE_PORT'),
+            # Keep a connection open per worker thread for this many seconds
+            # (0 closes it after every request) and ping it before reuse.
+            'CONN_MAX_AGE': env('DATABASE_CONN_MAX_AGE'),
+            'CONN_HEALTH_CHECKS': env('DATABASE_CONN_HEALTH_CHECKS'),
+            'OPTIONS': {},
         }
     }
+    if env('DATABASE_POOL'):
+        # A psycopg pool per worker process. Connections go back to the pool
+        # at the end of each request, so persistent connections are off; the
+        # pool checks a connection before handing it out when health checks
+        # are on. Size it to at least SERVER_THREADS.
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': env('DATABASE_POOL_MIN_SIZE'),
+            'max_size': env('DATABASE_POOL_MAX_SIZE'),
+            'timeout': env('DATABASE_POOL_TIMEOUT'),
+            'max_idle': env('DATABASE_POOL_MAX_IDLE'),
+            'max_lifetime': env('DATABASE_POOL_MAX_LIFETIME'),
+        }
 else:
     DATABASES = {
         'default': {
@@ -132,14 +197,130 @@ else:
         }
     }
 
+# Read replica. Public GET requests read from it (SecCodeSmithBackend.routers);
+# everything else, and any client that wrote in the last REPLICA_PIN_SECONDS,
+# uses the primary. With PostgreSQL set DATABASE_REPLICA_HOST (port and name
+# default to the primary's); with SQLite set DATABASE_REPLICA_NAME to a second
+# database file. Tests run the replica as a mirror of the test database.
+REPLICA_DATABASE = 'replica'
+if env('DATABASE_TYPE') == 'pgsql' and env('DATABASE_REPLICA_HOST'):
+    DATABASES[REPLICA_DATABASE] = {
+        **DATABASES['default'],
+        'HOST': env('DATABASE_REPLICA_HOST'),
+        'PORT': env('DATABASE_REPLICA_PORT') or env('DATABASE_PORT'),
+        'NAME': env('DATABASE_REPLICA_NAME') or env('DATABASE_NAME'),
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
+    }
+elif env('DATABASE_TYPE') != 'pgsql' and env('DATABASE_REPLICA_NAME'):
+    DATABASES[REPLICA_DATABASE] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / env('DATABASE_REPLICA_NAME'),
+        'TEST': {'MIRROR': 'default'},
+    }
 
+if REPLICA_DATABASE in DATABASES:
+    DATABASE_ROUTERS = ['SecCodeSmithBackend.routers.ReplicaRouter']
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+        'SecCodeSmithBackend.middleware.ReplicaPinningMiddleware',
+    )
+# Seconds a client keeps reading from the primary after it wrote, so it sees
+# its own changes; how far the replica may fall behind before reads go back
+# to the primary; and how often lag and reachability are re-checked.
+REPLICA_PIN_SECONDS = env('REPLICA_PIN_SECONDS')
+REPLICA_MAX_LAG = env('REPLICA_MAX_LAG')
+REPLICA_CHECK_INTERVAL = env('REPLICA_CHECK_INTERVAL')
+
+# RedisCache with the async methods the async views use going through
+# redis.asyncio instead of a single sync_to_async thread.
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "BACKEND": "SecCodeSmithBackend.cache.AsyncRedisCache",
         "LOCATION": "redis://:Password@127.0.0.1:6379/1",
     }
 }
 
+# Cached responses are invalidated by model version counters (api.cache),
+# so the TTL only bounds memory use; the jitter spreads expiry times.
+PAGE_CACHE_TIME = env('PAGE_CACHE_TIME')
+PAGE_CACHE_JITTER = env('PAGE_CACHE_JITTER')
+# Stampede protection: how long an expired entry may still be served while
+# one worker rebuilds it, how long that worker holds the rebuild lock, and
+# how eagerly entries are refreshed before they expire (0 disables it).
+PAGE_CACHE_STALE_TIME = env('PAGE_CACHE_STALE_TIME')
+PAGE_CACHE_LOCK_TIMEOUT = env('PAGE_CACHE_LOCK_TIMEOUT')
+PAGE_CACHE_EARLY_REFRESH_BETA = env('PAGE_CACHE_EARLY_REFRESH_BETA')
+# Cached responses keep gzip (and brotli, when installed) copies of their
+# body. They are built once per content version, so the strongest levels
+# are affordable; short bodies are not worth compressing.
+PAGE_CACHE_COMPRESS_MIN_LENGTH = env('PAGE_CACHE_COMPRESS_MIN_LENGTH')
+PAGE_CACHE_GZIP_LEVEL = env('PAGE_CACHE_GZIP_LEVEL')
+PAGE_CACHE_BROTLI_QUALITY = env('PAGE_CACHE_BROTLI_QUALITY')
+
+# Serve blog category post counts from a precomputed cache entry that is
+# dropped whenever a post or category changes.
+BLOG_CATEGORY_COUNTS_CACHE = env('BLOG_CATEGORY_COUNTS_CACHE')
+# Same for the project category list, dropped on project/category changes.
+PROJECT_CATEGORY_COUNTS_CACHE = env('PROJECT_CATEGORY_COUNTS_CACHE')
+
+# PostgreSQL text search configuration used for the blog search vector.
+POST_SEARCH_CONFIG = env('POST_SEARCH_CONFIG')
+
+# JSON encoder behind api.renderers: 'orjson' (falls back to the standard
+# library when it is not installed) or 'json'.
+JSON_BACKEND = env('JSON_BACKEND')
+
+# Production server (gunicorn.conf.py). SERVER_INTERFACE picks the wsgi or
+# asgi application; 0 workers means 2 * CPUs + 1. WSGI workers with more
+# than one thread keep connections alive for SERVER_KEEPALIVE seconds (the
+# single-threaded sync worker closes them). Workers are recycled
+# after SERVER_MAX_REQUESTS (+ jitter) requests, and get
+# SERVER_GRACEFUL_TIMEOUT seconds to finish on reload (SIGHUP) or shutdown.
+SERVER_INTERFACE = env('SERVER_INTERFACE')
+SERVER_BIND = env('SERVER_BIND')
+SERVER_WORKERS = env('SERVER_WORKERS')
+SERVER_THREADS = env('SERVER_THREADS')
+SERVER_PRELOAD = env('SERVER_PRELOAD')
+SERVER_MAX_REQUESTS = env('SERVER_MAX_REQUESTS')
+SERVER_MAX_REQUESTS_JITTER = env('SERVER_MAX_REQUESTS_JITTER')
+SERVER_KEEPALIVE = env('SERVER_KEEPALIVE')
+SERVER_TIMEOUT = env('SERVER_TIMEOUT')
+SERVER_GRACEFUL_TIMEOUT = env('SERVER_GRACEFUL_TIMEOUT')
+
+# Route the about, contact, post and project detail endpoints to their async
+# views, which load independent queries concurrently. Meant for
+# SERVER_INTERFACE=asgi; under WSGI each request would pay for an event loop.
+ASYNC_READ_VIEWS = env('ASYNC_READ_VIEWS')
+
+# Uploaded images are stored as WebP at full size plus one copy per width
+# below that is narrower than the original (Images.pipeline); the APIs list
+# them as a srcset. Run build_image_derivatives after changing the widths.
+IMAGE_DERIVATIVE_WIDTHS = [int(width) for width in env('IMAGE_DERIVATIVE_WIDTHS')]
+IMAGE_WEBP_QUALITY = env('IMAGE_WEBP_QUALITY')
+# Conversion runs in the process_image_jobs worker (a pool of
+# IMAGE_WORKER_PROCESSES processes, 0 = one per CPU core). Failed jobs are
+# retried up to IMAGE_JOB_MAX_ATTEMPTS times; running jobs older than
+# IMAGE_JOB_TIMEOUT seconds are assumed lost and queued again.
+# IMAGE_JOBS_INLINE converts in the admin request instead, for setups
+# without a worker.
+IMAGE_JOBS_INLINE = env('IMAGE_JOBS_INLINE')
+IMAGE_WORKER_PROCESSES = env('IMAGE_WORKER_PROCESSES')
+IMAGE_JOB_MAX_ATTEMPTS = env('IMAGE_JOB_MAX_ATTEMPTS')
+IMAGE_JOB_TIMEOUT = env('IMAGE_JOB_TIMEOUT')
+# Stored images are bounded to IMAGE_MAX_DIMENSION pixels on the long edge
+# (0 keeps the upload's size), which lets JPEGs be decoded at reduced scale.
+# Uploads over IMAGE_MAX_UPLOAD_SIZE bytes or IMAGE_MAX_PIXELS pixels are
+# rejected before decoding; Pillow's decompression bomb guard uses the same
+# pixel limit.
+IMAGE_MAX_DIMENSION = env('IMAGE_MAX_DIMENSION')
+IMAGE_MAX_PIXELS = env('IMAGE_MAX_PIXELS')
+IMAGE_MAX_UPLOAD_SIZE = env('IMAGE_MAX_UPLOAD_SIZE')
+# Store converted images under media/content/ named by the SHA-256 of their
+# bytes, shared by every row that uploads the same picture. Such files never
+# change, so they are served with immutable, far-future cache headers.
+IMAGE_CONTENT_ADDRESSED = env('IMAGE_CONTENT_ADDRESSED')
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -184,11 +365,14 @@ STATIC_ROOT = BASE_DIR / "static"
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# The browsable API is a development aid, production only speaks JSON. It has
+# its own switch because DEBUG above is not read from the environment.
+BROWSABLE_API = env('BROWSABLE_API')
+
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
-    ],
+        'api.renderers.FastJSONRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if BROWSABLE_API else []),
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
     ],
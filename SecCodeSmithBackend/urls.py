@@ -3,6 +3,8 @@ from django.contrib import admin
 from django.urls import include, path
 
 import BlogApi
+from Images.pipeline import CONTENT_DIR
+from Images.views import serve_immutable
 from SecCodeSmithBackend import settings
 from api.views import *
 
@@ -13,4 +15,5 @@ urlpatterns = ([
     path("img/", include("Images.urls")),
     path("project-api/", include("ProjectApi.urls")),
 ]
+               + static(f"{settings.MEDIA_URL}{CONTENT_DIR}/", view=serve_immutable)
                + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT))
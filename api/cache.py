@@ -0,0 +1,484 @@
+import asyncio
+import hashlib
+import math
+import random
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from api.compression import choose_encoding, compressed_variants
+from SecCodeSmithBackend.routers import primary_reads, reads_replica
+
+# Apps whose model writes invalidate cached responses.
+VERSIONED_APPS = ('api', 'BlogApi', 'ProjectApi', 'Images')
+# Queue bookkeeping in those apps that no response is built from.
+UNVERSIONED_MODELS = ('Images.ImageJob', 'Images.ImageContent', 'Images.ImageContentFile')
+
+MODEL_VERSION_KEY = 'model-version:{}'
+RESPONSE_KEY = 'response:{}:{}:{}'
+LOCK_KEY = '{}:lock'
+MODEL_WRITTEN_KEY = 'model-written:{}'
+CACHEABLE_STATUS = (200, 404)
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _version_key(model):
+    return MODEL_VERSION_KEY.format(model._meta.label_lower)
+
+
+def _written_key(model):
+    return MODEL_WRITTEN_KEY.format(model._meta.label_lower)
+
+
+def _initial_version():
+    # Seed from the clock so a counter that was evicted never restarts at a
+    # value that older, still cached responses were keyed with.
+    return time.time_ns() // 1000
+
+
+def is_versioned(model):
+    return (model._meta.app_label in VERSIONED_APPS
+            and model._meta.label not in UNVERSIONED_MODELS)
+
+
+def get_model_versions(models):
+    """
+    Current version counter of every model in ``models``, in order.
+    """
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: _initial_version() for key in keys if key not in versions}
+    for key, version in missing.items():
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+        versions[key] = version
+    return [versions[key] for key in keys]
+
+
+async def aget_model_versions(models):
+    """
+    Async ``get_model_versions``.
+    """
+    keys = [_version_key(model) for model in models]
+    versions = await cache.aget_many(keys)
+    missing = {key: _initial_version() for key in keys if key not in versions}
+    for key, version in missing.items():
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key, version)
+        versions[key] = version
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(model):
+    """
+    Invalidate every cached response that depends on ``model``.
+    """
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), timeout=None)
+    # Deletes and m2m changes leave no ``updated_at`` behind, remember when
+    # the model last changed for ``models_last_modified``.
+    cache.set(_written_key(model), timezone.now(), timeout=None)
+
+
+def jittered_timeout(timeout=None):
+    """
+    ``PAGE_CACHE_TIME`` (or ``timeout``) spread by ``PAGE_CACHE_JITTER`` so
+    entries written together do not expire together.
+    """
+    timeout = settings.PAGE_CACHE_TIME if timeout is None else timeout
+    spread = timeout * settings.PAGE_CACHE_JITTER
+    return max(1, int(timeout + random.uniform(-spread, spread)))
+
+
+def _join_versions(versions):
+    return '.'.join(str(version) for version in versions)
+
+
+def _response_key(view_name, request, versions):
+    path = hashlib.sha1(request.get_full_path().encode()).hexdigest()
+    return RESPONSE_KEY.format(view_name, path, _join_versions(versions))
+
+
+def response_cache_key(view_name, request, models):
+    return _response_key(view_name, request, get_model_versions(models))
+
+
+def _should_refresh(envelope, now):
+    """
+    Probabilistic early expiration (XFetch): the closer an entry is to its
+    expiry and the longer it took to build, the likelier one reader
+    rebuilds it ahead of time instead of every reader at once on expiry.
+    """
+    beta = settings.PAGE_CACHE_EARLY_REFRESH_BETA
+    return now - envelope['delta'] * beta * math.log(1.0 - random.random()) >= envelope['expires']
+
+
+def _wait_for(key, lock_key):
+    """
+    Poll for the envelope the lock holder is building. Gives up with None
+    once the lock is released without one (the response was not cacheable,
+    or building it failed) or after PAGE_CACHE_LOCK_TIMEOUT.
+    """
+    deadline = time.monotonic() + settings.PAGE_CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        found = cache.get_many([key, lock_key])
+        if key in found:
+            return found[key]
+        if lock_key not in found:
+            return None
+    return None
+
+
+async def _await_for(key, lock_key):
+    """
+    Async ``_wait_for``.
+    """
+    deadline = time.monotonic() + settings.PAGE_CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        found = await cache.aget_many([key, lock_key])
+        if key in found:
+            return found[key]
+        if lock_key not in found:
+            return None
+    return None
+
+
+def _envelope(value, started, timeout):
+    ttl = jittered_timeout(timeout)
+    envelope = {
+        'value': value,
+        'expires': time.time() + ttl,
+        'delta': time.monotonic() - started,
+    }
+    # Keep the entry past its soft expiry so it can be served stale
+    # while a single worker rebuilds it.
+    return envelope, ttl + settings.PAGE_CACHE_STALE_TIME
+
+
+def _compute_and_store(key, compute, timeout):
+    started = time.monotonic()
+    value = compute()
+    if value is not None:
+        cache.set(key, *_envelope(value, started, timeout))
+    return value
+
+
+async def _acompute_and_store(key, compute, timeout):
+    started = time.monotonic()
+    value = await compute()
+    if value is not None:
+        await cache.aset(key, *_envelope(value, started, timeout))
+    return value
+
+
+def single_flight(key, compute, timeout=None):
+    """
+    Return the cached value for ``key``, calling ``compute`` to build it.
+
+    Only the worker holding a short per-key lock recomputes; other workers
+    get the stale value while it does, or wait for the fresh one when there
+    is nothing to serve. ``compute`` returning None is not cached.
+    """
+    envelope = cache.get(key)
+    if envelope is not None and not _should_refresh(envelope, time.time()):
+        return envelope['value']
+
+    lock_key = LOCK_KEY.format(key)
+    if not cache.add(lock_key, 1, settings.PAGE_CACHE_LOCK_TIMEOUT):
+        if envelope is None:
+            envelope = _wait_for(key, lock_key)
+        if envelope is not None:
+            return envelope['value']
+        # Nothing cacheable came of the lock holder's build, or it is too
+        # slow: build it here rather than fail.
+        return _compute_and_store(key, compute, timeout)
+
+    try:
+        return _compute_and_store(key, compute, timeout)
+    finally:
+        cache.delete(lock_key)
+
+
+async def asingle_flight(key, compute, timeout=None):
+    """
+    Async ``single_flight``; ``compute`` is a coroutine function.
+    """
+    envelope = await cache.aget(key)
+    if envelope is not None and not _should_refresh(envelope, time.time()):
+        return envelope['value']
+
+    lock_key = LOCK_KEY.format(key)
+    if not await cache.aadd(lock_key, 1, settings.PAGE_CACHE_LOCK_TIMEOUT):
+        if envelope is None:
+            envelope = await _await_for(key, lock_key)
+        if envelope is not None:
+            return envelope['value']
+        return await _acompute_and_store(key, compute, timeout)
+
+    try:
+        return await _acompute_and_store(key, compute, timeout)
+    finally:
+        await cache.adelete(lock_key)
+
+
+def _cache_entry(response):
+    # DRF responses are rendered later, outside the view method.
+    if (response.status_code not in CACHEABLE_STATUS
+            or not getattr(response, 'is_rendered', True)):
+        return None
+    return {
+        'content': response.content,
+        'encoded': compressed_variants(response.content),
+        'status': response.status_code,
+        'content_type': response['Content-Type'],
+    }
+
+
+def _changed_since(stamps, seconds):
+    since = timezone.now() - timedelta(seconds=seconds)
+    return any(stamp is not None and stamp > since for stamp in stamps.values())
+
+
+def shared_reads(models):
+    """
+    Reads for a response cached for every client: on the primary while any
+    of ``models`` changed within ``REPLICA_MAX_LAG`` seconds, otherwise
+    wherever the request reads from.
+    """
+    if reads_replica():
+        stamps = cache.get_many([_written_key(model) for model in models])
+        if _changed_since(stamps, settings.REPLICA_MAX_LAG):
+            return primary_reads()
+    return nullcontext()
+
+
+async def ashared_reads(models):
+    """
+    Async ``shared_reads``.
+    """
+    if reads_replica():
+        stamps = await cache.aget_many([_written_key(model) for model in models])
+        if _changed_since(stamps, settings.REPLICA_MAX_LAG):
+            return primary_reads()
+    return nullcontext()
+
+
+def versioned_cache(*models, timeout=None):
+    """
+    Cache a view method's response under a key built from the request path
+    and the version counters of ``models``. Saving or deleting any of those
+    models bumps its counter, so only dependent responses are invalidated.
+    Rebuilds go through ``single_flight``.
+
+    Compressed variants are stored with the entry, so each content version
+    is compressed once and served by ``Accept-Encoding`` from then on.
+
+    Entries are built through ``shared_reads``, so one built from the
+    replica never misses a commit the new version stands for.
+
+    Async view methods get an async wrapper using the async cache API.
+    """
+    def decorator(view_method):
+        view_name = view_method.__qualname__
+
+        if iscoroutinefunction(view_method):
+            @wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view_method(self, request, *args, **kwargs)
+
+                built = []
+
+                async def build_entry():
+                    with await ashared_reads(models):
+                        response = await view_method(self, request, *args, **kwargs)
+                    built.append(response)
+                    # Compression is CPU work, keep it off the event loop.
+                    return await sync_to_async(_cache_entry, thread_sensitive=False)(response)
+
+                versions = await aget_model_versions(models)
+                key = _response_key(view_name, request, versions)
+                entry = await asingle_flight(key, build_entry, timeout)
+                if entry is None:
+                    return built[0]
+                return cached_response(request, entry)
+
+            return async_wrapper
+
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_method(self, request, *args, **kwargs)
+
+            built = []
+
+            def build_entry():
+                with shared_reads(models):
+                    response = view_method(self, request, *args, **kwargs)
+                built.append(response)
+                return _cache_entry(response)
+
+            key = response_cache_key(view_name, request, models)
+            entry = single_flight(key, build_entry, timeout)
+            if entry is None:
+                return built[0]
+            return cached_response(request, entry)
+
+        return wrapper
+
+    return decorator
+
+
+def cached_response(request, entry):
+    """
+    Rebuild a response from a ``versioned_cache`` entry, in the best content
+    coding the request accepts.
+    """
+    encoded = entry.get('encoded', {})
+    encoding = choose_encoding(request, encoded)
+    content = encoded[encoding] if encoding else entry['content']
+    response = HttpResponse(content, status=entry['status'],
+                            content_type=entry['content_type'])
+    if encoding:
+        response['Content-Encoding'] = encoding
+    if encoded:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def models_last_modified(models):
+    """
+    Time of the last write to any of ``models``. Writes are recorded by
+    ``bump_model_version``; a model with no recorded write falls back to its
+    latest ``updated_at`` once, so a warm lookup costs no query. An empty
+    table is remembered as None until its first write.
+    """
+    keys = {model: _written_key(model) for model in models}
+    stamps = cache.get_many(keys.values())
+    for model, key in keys.items():
+        if key in stamps:
+            continue
+        latest = model.objects.aggregate(latest=Max('updated_at'))['latest']
+        if not cache.add(key, latest, timeout=None):
+            latest = cache.get(key, latest)
+        stamps[key] = latest
+    return max((stamp for stamp in stamps.values() if stamp is not None), default=None)
+
+
+async def amodels_last_modified(models):
+    """
+    Async ``models_last_modified``.
+    """
+    keys = {model: _written_key(model) for model in models}
+    stamps = await cache.aget_many(keys.values())
+    for model, key in keys.items():
+        if key in stamps:
+            continue
+        latest = (await model.objects.aaggregate(latest=Max('updated_at')))['latest']
+        if not await cache.aadd(key, latest, timeout=None):
+            latest = await cache.aget(key, latest)
+        stamps[key] = latest
+    return max((stamp for stamp in stamps.values() if stamp is not None), default=None)
+
+
+def _etag(view_name, request, versions, extra):
+    source = f"{view_name}:{request.get_full_path()}:{_join_versions(versions)}:{extra}"
+    # Weak, since the same version is served in several content codings.
+    return f'W/"{hashlib.sha1(source.encode()).hexdigest()}"'
+
+
+def response_etag(view_name, request, models, extra=''):
+    return _etag(view_name, request, get_model_versions(models), extra)
+
+
+def _add_validators(response, etag, timestamp):
+    if not response.has_header('ETag'):
+        response['ETag'] = etag
+    if timestamp is not None and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+def conditional(*models, last_modified=None, etag_extra=None):
+    """
+    Send ETag and Last-Modified on a view method's responses and answer
+    matching ``If-None-Match`` / ``If-Modified-Since`` with 304 before the
+    view runs.
+
+    The ETag is derived from the request path and the version counters of
+    ``models``. Last-Modified defaults to ``models_last_modified``;
+    ``last_modified`` and ``etag_extra`` are optional callables taking the
+    view arguments, for endpoints whose freshness also depends on the
+    clock or on specific rows. On async view methods those callables stay
+    synchronous and are run in a worker thread.
+    """
+    def decorator(view_method):
+        view_name = view_method.__qualname__
+
+        if iscoroutinefunction(view_method):
+            @wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view_method(self, request, *args, **kwargs)
+
+                extra = ''
+                if etag_extra:
+                    extra = await sync_to_async(etag_extra)(request, *args, **kwargs)
+                versions = await aget_model_versions(models)
+                etag = _etag(view_name, request, versions, extra)
+                if last_modified:
+                    modified = await sync_to_async(last_modified)(request, *args, **kwargs)
+                else:
+                    modified = await amodels_last_modified(models)
+                timestamp = int(modified.timestamp()) if modified else None
+
+                response = get_conditional_response(request, etag=etag,
+                                                     last_modified=timestamp)
+                if response is None:
+                    response = await view_method(self, request, *args, **kwargs)
+                    if response.status_code not in CACHEABLE_STATUS:
+                        return response
+                return _add_validators(response, etag, timestamp)
+
+            return async_wrapper
+
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_method(self, request, *args, **kwargs)
+
+            extra = etag_extra(request, *args, **kwargs) if etag_extra else ''
+            etag = response_etag(view_name, request, models, extra)
+            if last_modified:
+                modified = last_modified(request, *args, **kwargs)
+            else:
+                modified = models_last_modified(models)
+            timestamp = int(modified.timestamp()) if modified else None
+
+            response = get_conditional_response(request, etag=etag,
+                                                 last_modified=timestamp)
+            if response is None:
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code not in CACHEABLE_STATUS:
+                    return response
+            return _add_validators(response, etag, timestamp)
+
+        return wrapper
+
+    return decorator
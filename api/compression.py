@@ -0,0 +1,69 @@
+import gzip
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred first when the client accepts several.
+ENCODINGS = ('br', 'gzip')
+
+
+def _compress(encoding, content):
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.PAGE_CACHE_BROTLI_QUALITY)
+    # mtime=0 keeps the output identical for identical content.
+    return gzip.compress(content, compresslevel=settings.PAGE_CACHE_GZIP_LEVEL, mtime=0)
+
+
+def compressed_variants(content):
+    """
+    Compressed copies of ``content`` keyed by content coding. Bodies below
+    ``PAGE_CACHE_COMPRESS_MIN_LENGTH`` and variants that come out no smaller
+    are left out; ``br`` is only produced when ``brotli`` is installed.
+    """
+    if len(content) < settings.PAGE_CACHE_COMPRESS_MIN_LENGTH:
+        return {}
+    variants = {}
+    for encoding in ENCODINGS:
+        if encoding == 'br' and brotli is None:
+            continue
+        compressed = _compress(encoding, content)
+        if len(compressed) < len(content):
+            variants[encoding] = compressed
+    return variants
+
+
+def accepted_encodings(header):
+    """
+    Parse an ``Accept-Encoding`` header into ``{coding: qvalue}``.
+    """
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(request, available):
+    """
+    Best of the ``available`` content codings the request accepts, or None
+    for the identity body.
+    """
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    for encoding in ENCODINGS:
+        if encoding in available and accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
@@ -0,0 +1,84 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import load_backend
+
+MODES = ('fresh', 'persistent', 'pooled')
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+class Command(BaseCommand):
+    help = ("Compare per-request database latency with a new connection per "
+            "request, persistent connections (CONN_MAX_AGE) and a psycopg "
+            "connection pool. Each simulated request runs the same "
+            "open/close handling as Django's request_started/finished.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--mode', action='append', choices=MODES, dest='modes',
+                            help="Mode to run, may be repeated. Defaults to all.")
+
+    def make_connection(self, database, mode):
+        base = connections[database].settings_dict
+        options = {key: value for key, value in base['OPTIONS'].items() if key != 'pool'}
+        settings_dict = {**base, 'OPTIONS': options, 'CONN_HEALTH_CHECKS': True}
+        if mode == 'fresh':
+            settings_dict['CONN_MAX_AGE'] = 0
+        elif mode == 'persistent':
+            settings_dict['CONN_MAX_AGE'] = None
+        else:
+            settings_dict['CONN_MAX_AGE'] = 0
+            options['pool'] = base['OPTIONS'].get('pool') or True
+        backend = load_backend(settings_dict['ENGINE'])
+        return backend.DatabaseWrapper(settings_dict, f"bench-{mode}")
+
+    def run_requests(self, connection, requests):
+        # Count server sessions by backend pid on PostgreSQL, otherwise
+        # count the driver connections Django had to open.
+        postgres = connection.vendor == 'postgresql'
+        query = "SELECT pg_backend_pid()" if postgres else "SELECT 1"
+        latencies = []
+        sessions = set()
+        for request in range(requests):
+            started = time.perf_counter()
+            connection.close_if_unusable_or_obsolete()
+            previous = connection.connection
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                row = cursor.fetchone()
+            if postgres:
+                sessions.add(row[0])
+            elif connection.connection is not previous:
+                sessions.add(request)
+            connection.close_if_unusable_or_obsolete()
+            latencies.append((time.perf_counter() - started) * 1000)
+        return sorted(latencies), len(sessions)
+
+    def handle(self, *args, **options):
+        vendor = connections[options['database']].vendor
+        modes = options['modes'] or MODES
+        if 'pooled' in modes and vendor != 'postgresql':
+            if options['modes']:
+                raise CommandError("Pooling needs PostgreSQL with psycopg 3.")
+            self.stdout.write(self.style.WARNING(
+                f"Skipping 'pooled': {vendor} has no connection pool support."))
+            modes = [mode for mode in modes if mode != 'pooled']
+
+        self.stdout.write(f"{'mode':<11} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'sessions':>8}")
+        for mode in modes:
+            connection = self.make_connection(options['database'], mode)
+            try:
+                latencies, sessions = self.run_requests(connection, options['requests'])
+            finally:
+                connection.close()
+                if hasattr(connection, 'close_pool'):
+                    connection.close_pool()
+            self.stdout.write(f"{mode:<11} {statistics.fmean(latencies):8.3f} "
+                              f"{percentile(latencies, 0.5):8.3f} "
+                              f"{percentile(latencies, 0.95):8.3f} {sessions:>8}")
@@ -0,0 +1,97 @@
+import http.client
+import itertools
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+
+def default_paths():
+    return [
+        reverse('skills-cards'),
+        reverse('social-links-footer'),
+        reverse('BlogApi:blog-tags'),
+        reverse('BlogApi:post-page', kwargs={'page_number': 1}),
+        reverse('projects:projects'),
+    ]
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+class Command(BaseCommand):
+    help = ("Load-test a running server: send --requests GET requests over "
+            "--concurrency connections and report throughput and latency.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help="Path to request, may be repeated.")
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--no-keepalive', action='store_true',
+                            help="Open a new connection for every request.")
+
+    def handle(self, *args, **options):
+        base = urlsplit(options['base_url'])
+        if base.scheme not in ('http', 'https'):
+            raise CommandError("--base-url must be an http(s) URL.")
+        connection_class = (http.client.HTTPSConnection if base.scheme == 'https'
+                            else http.client.HTTPConnection)
+        paths = itertools.cycle(options['paths'] or default_paths())
+        paths_lock = threading.Lock()
+        keepalive = not options['no_keepalive']
+        local = threading.local()
+
+        def send(_):
+            with paths_lock:
+                path = next(paths)
+            connection = getattr(local, 'connection', None)
+            if connection is None:
+                connection = connection_class(base.netloc, timeout=30)
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path, headers={
+                    'Accept-Encoding': 'gzip, br',
+                    'Connection': 'keep-alive' if keepalive else 'close',
+                })
+                response = connection.getresponse()
+                response.read()
+                result = response.status
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                connection = None
+                result = type(e).__name__
+            elapsed = time.perf_counter() - started
+            if keepalive and connection is not None:
+                local.connection = connection
+            else:
+                if connection is not None:
+                    connection.close()
+                local.connection = None
+            return result, elapsed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(send, range(options['requests'])))
+        total = time.perf_counter() - started
+
+        statuses = Counter(result for result, _ in results)
+        latencies = sorted(elapsed * 1000 for _, elapsed in results)
+        self.stdout.write(f"{len(results)} requests in {total:.2f}s "
+                          f"({len(results) / total:.1f} req/s), "
+                          f"concurrency {options['concurrency']}, "
+                          f"keep-alive {'on' if keepalive else 'off'}")
+        self.stdout.write(f"latency ms: mean {statistics.fmean(latencies):.2f}  "
+                          f"p50 {percentile(latencies, 0.50):.2f}  "
+                          f"p95 {percentile(latencies, 0.95):.2f}  "
+                          f"p99 {percentile(latencies, 0.99):.2f}  "
+                          f"max {latencies[-1]:.2f}")
+        self.stdout.write("responses: " + ", ".join(
+            f"{status}: {count}" for status, count in sorted(statuses.items(), key=str)))
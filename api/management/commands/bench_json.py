@@ -0,0 +1,81 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.models import About
+from api.payloads import build_about_payload
+
+
+def post_page_payload(posts, content_length):
+    # Shaped like PostPageViewEndpoint / PostViewsEndpoint output.
+    return {
+        'page': 1,
+        'posts': [{
+            'id': i,
+            'title': f"Benchmark post {i}",
+            'slug': f"benchmark-post-{i}",
+            'excerpt': "Short summary of the post. " * 4,
+            'author': {'name': "Author", 'bio': "Bio " * 20, 'avatar': "/media/a.webp"},
+            'publish_at': "01-01-2025",
+            'comments': i,
+            'featured': i % 2 == 0,
+            'image': f"/media/posts/images/{i}.webp",
+            'tags': [{'name': f"tag {t}", 'slug': f"tag-{t}"} for t in range(5)],
+            'category': {'title': "Category", 'slug': "category"},
+            'content': ("Lorem ipsum dolor sit amet, zażółć gęślą jaźń. " *
+                        (content_length // 48 + 1))[:content_length],
+        } for i in range(posts)]
+    }
+
+
+class Command(BaseCommand):
+    help = ("Compare JSON serialization of the largest API payloads with the "
+            "standard library (JsonResponse), DRF's JSONRenderer and orjson.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100)
+        parser.add_argument('--content-length', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def time_encoder(self, encode, payload, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            size = len(encode(payload))
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, size
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError("orjson is not installed.")
+
+        payloads = [
+            ('post page', post_page_payload(options['posts'], options['content_length'])),
+            ('post detail', post_page_payload(1, options['content_length'] * 5)['posts'][0]),
+        ]
+        about = About.objects.select_related('lang').first()
+        if about is not None:
+            payloads.append(('about', build_about_payload(about.lang.iso_code)))
+
+        drf = JSONRenderer()
+        encoders = (
+            ('json', lambda data: json.dumps(data, cls=DjangoJSONEncoder).encode()),
+            ('drf', lambda data: drf.render(data)),
+            ('orjson', lambda data: renderers.orjson.dumps(
+                data, default=DjangoJSONEncoder().default,
+                option=renderers.orjson.OPT_NON_STR_KEYS)),
+        )
+
+        self.stdout.write(f"{'payload':<12} {'encoder':<7} {'best ms':>9} {'bytes':>9} {'speedup':>8}")
+        for name, payload in payloads:
+            baseline = None
+            for encoder, encode in encoders:
+                elapsed, size = self.time_encoder(encode, payload, options['repeat'])
+                baseline = baseline or elapsed
+                self.stdout.write(f"{name:<12} {encoder:<7} {elapsed * 1000:9.3f} "
+                                  f"{size:>9} {baseline / elapsed:7.1f}x")
@@ -0,0 +1,84 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from BlogApi.models import Category, Post
+from Images.models import Image
+from ProjectApi.models import Project, ProjectCategory
+from api.models import Lang
+
+
+class Command(BaseCommand):
+    help = ("Render every public GET endpoint in-process so the response "
+            "cache is filled before real visitors arrive.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=5,
+                            help="Number of blog listing pages to warm.")
+        parser.add_argument('--per-page', type=int, default=6,
+                            help="Posts per listing page, as the frontend requests them.")
+        parser.add_argument('--workers', type=int, default=8,
+                            help="Number of requests rendered in parallel.")
+
+    def public_urls(self, pages, per_page):
+        urls = [
+            reverse('skills-cards'),
+            reverse('about_default'),
+            reverse('social-links-footer'),
+            reverse('contact_default'),
+            reverse('BlogApi:blog-tags'),
+            reverse('BlogApi:blog-categories'),
+            reverse('BlogApi:post_page_count', kwargs={'post_per_page': per_page}),
+            reverse('projects:projects'),
+            reverse('projects:project-category'),
+        ]
+        for iso_code in Lang.objects.values_list('iso_code', flat=True):
+            urls.append(reverse('about', kwargs={'lang_arg': iso_code}))
+            urls.append(reverse('contact', kwargs={'lang_arg': iso_code}))
+        for slug in Post.objects.values_list('slug', flat=True):
+            urls.append(reverse('BlogApi:post', kwargs={'slug': slug}))
+        for slug in Category.objects.values_list('slug', flat=True):
+            urls.append(reverse('BlogApi:related_post', kwargs={'category_slug': slug}))
+        for page in range(1, pages + 1):
+            urls.append(f"{reverse('BlogApi:post-page', kwargs={'page_number': page})}"
+                        f"?per_page={per_page}")
+        for short in ProjectCategory.objects.values_list('short', flat=True):
+            urls.append(f"{reverse('projects:projects')}?cat={short}")
+        for pk in Project.objects.values_list('pk', flat=True):
+            urls.append(reverse('projects:project-detail', kwargs={'project_id': pk}))
+        for name in Image.objects.values_list('name', flat=True).distinct():
+            urls.append(reverse('image:image_list', kwargs={'name': name}))
+        return urls
+
+    def handle(self, *args, **options):
+        urls = self.public_urls(options['pages'], options['per_page'])
+
+        def render(url):
+            started = time.perf_counter()
+            try:
+                status_code = Client().get(url).status_code
+            except Exception as e:
+                status_code = type(e).__name__
+            return url, status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        if options['workers'] > 1:
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                results = list(executor.map(render, urls))
+        else:
+            results = [render(url) for url in urls]
+        total = time.perf_counter() - started
+
+        failed = 0
+        for url, status_code, elapsed in sorted(results, key=lambda r: r[2], reverse=True):
+            ok = status_code in (200, 404)
+            failed += not ok
+            line = f"{elapsed * 1000:9.1f} ms  {status_code}  {url}"
+            self.stdout.write(line if ok else self.style.ERROR(line))
+
+        summary = (f"Warmed {len(results)} URLs in {total:.2f}s with "
+                   f"{options['workers']} workers, {failed} failed.")
+        self.stdout.write(self.style.WARNING(summary) if failed else self.style.SUCCESS(summary))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='about',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
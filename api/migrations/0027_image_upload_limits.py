@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 01:24
+
+import Images.pipeline
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_image_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='about',
+            name='image',
+            field=models.ImageField(upload_to='', validators=[Images.pipeline.validate_image_upload], verbose_name='About Image'),
+        ),
+    ]
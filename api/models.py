@@ -4,6 +4,7 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
 from django.core.validators import URLValidator
 from api.validator import *
+from Images.pipeline import ImageStatus, preview_url, srcset, validate_image_upload
 
 class IconsClass(models.Model):
     """
@@ -21,6 +22,7 @@ class IconsClass(models.Model):
     )
 
     description = models.TextField(null=True, blank=True, verbose_name=_("Description"))
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
 
     class Meta:
         ordering = ["name"]
@@ -72,6 +74,7 @@ class SocialLinks(models.Model):
         verbose_name=_("About Pages"),
         help_text=_("Whether to display this link on about pages"),
     )
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
 
     class Meta:
         verbose_name = _("Social Link")
@@ -88,6 +91,7 @@ class Lang(models.Model):
     """
     name = models.CharField(_("Language Name"), max_length=100)
     iso_code = models.CharField(_("ISO Code"), max_length=3)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
 
     def __str__(self):
         return self.name
@@ -103,6 +107,7 @@ class Contact(models.Model):
     language = models.ForeignKey(Lang,
                                  on_delete=models.CASCADE,
                                  related_name='contact_lang', )
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
 
     def __str__(self):
         return ('Email: {} Business email {} Phone {} Lang {}'
@@ -122,6 +127,7 @@ class Skill(models.Model):
                                    related_name='skills',
                                    on_delete=models.SET_NULL,
                                    null=True)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
 
     class Meta:
         verbose_name = _("Skill List")
@@ -146,6 +152,7 @@ class SkillsCard(models.Model):
                                    on_delete=models.SET_NULL,
                                    null=True)
     skills = models.ManyToManyField(Skill,)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
 
     def __str__(self):
         return self.category_title
@@ -161,6 +168,7 @@ class FAQ(models.Model):
     contact = models.ForeignKey(Contact,
                                 on_delete=models.CASCADE,
                                 verbose_name=_('Contact'),)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
     class Meta:
         verbose_name = _('FAQ')
         verbose_name_plural = _('FAQs')
@@ -180,7 +188,10 @@ class About(models.Model):
     image_title = models.CharField(_("Image Title"),
                                    max_length=100,
                                    default="The Master Behind the Mask")
-    image = models.ImageField(_("About Image"),)
+    image = models.ImageField(_("About Image"), validators=[validate_image_upload])
+    image_variants = models.JSONField(default=list, blank=True, editable=False)
+    image_status = models.CharField(max_length=10, choices=ImageStatus.choices,
+                                    default=ImageStatus.READY, editable=False)
     lang = models.OneToOneField(Lang,
                              on_delete=models.CASCADE,
                              related_name='about_lang')
@@ -192,6 +203,7 @@ class About(models.Model):
                                                   default="The Smith's Journey")
     testimonials_title = models.CharField(_("Testimonials Title"), max_length=100,
                                           default="Tales from the Guild")
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
 
 
     class Meta:
@@ -203,11 +215,15 @@ class About(models.Model):
     @admin.display
     def image_tag(self):
         return format_html('<img src="{}" alt={} height="100" />',
-                           self.image.url, self.about_title)
+                           preview_url(self.image, self.image_variants), self.about_title)
 
     image_tag.short_description = 'Image'
     image_tag.allow_tags = True
 
+    @property
+    def image_srcset(self):
+        return srcset(self.image, self.image_variants)
+
 class ProfessionalJourney(models.Model):
     """
     Model for professional journey
@@ -219,6 +235,7 @@ class ProfessionalJourney(models.Model):
     description = models.TextField(_("Description"), blank=True, null=True)
     about = models.ForeignKey(About, on_delete=models.CASCADE,
                               verbose_name=_('About_ProfessionalJourney'), null=True)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
 
     @property
     def duration(self):
@@ -246,6 +263,7 @@ class TechnicalArsenal(models.Model):
     title = models.CharField(_("Technical Arsenal Title"), max_length=100)
     about = models.ForeignKey(About, on_delete=models.CASCADE,
                               verbose_name=_('Technical Arsenal Skill'))
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
 
     def __str__(self):
         return self.title
@@ -254,6 +272,7 @@ class TechnicalArsenalSkill(models.Model):
     text = models.CharField(_('Technical Arsenal Skill'), max_length=100)
     technical_arsenal = models.ForeignKey(TechnicalArsenal, on_delete=models.CASCADE,
                               verbose_name=_('Technical Arsenal Skill'))
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
     class Meta:
         verbose_name = _('Technical Arsenal Skill')
 
@@ -270,6 +289,7 @@ class Testimonials(models.Model):
     text = models.TextField(_("Text"))
     about = models.ForeignKey(About, on_delete=models.CASCADE,
                               verbose_name=_('Technical Arsenal Skill'))
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
 
 class CoreValue(models.Model):
     """
@@ -283,6 +303,7 @@ class CoreValue(models.Model):
 
     about = models.ForeignKey(About, on_delete=models.CASCADE,
                               verbose_name=_('Core value about'))
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
 
     class Meta:
         verbose_name = _('core value')
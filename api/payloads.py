@@ -0,0 +1,180 @@
+from django.db.models import Prefetch
+
+from api.models import *
+from api.untils import gather_queries
+
+
+def journeys_queryset():
+    return ProfessionalJourney.objects.order_by('-end_date', '-start_date')
+
+
+def arsenal_queryset():
+    return (TechnicalArsenal.objects.select_related('icon')
+            .prefetch_related('technicalarsenalskill_set'))
+
+
+def core_values_queryset():
+    return CoreValue.objects.select_related('icon')
+
+
+def about_social_links_queryset():
+    return SocialLinks.objects.filter(about_pages=True).select_related('icon_class')
+
+
+def contact_social_links_queryset():
+    return SocialLinks.objects.filter(contact_pages=True).select_related('icon_class')
+
+
+def about_queryset():
+    """
+    About rows with every section of the About page prefetched, icons joined.
+    """
+    return About.objects.select_related('lang').prefetch_related(
+        Prefetch('professionaljourney_set', queryset=journeys_queryset()),
+        Prefetch('technicalarsenal_set', queryset=arsenal_queryset()),
+        Prefetch('corevalue_set', queryset=core_values_queryset()),
+        'testimonials_set',
+    )
+
+
+def _missing_about(lang, lang_arg):
+    return About.DoesNotExist('About in lang {} not found'.format(
+        lang.name if lang else lang_arg))
+
+
+def build_about_payload(lang_arg=None):
+    """
+    Build the About page payload for ``lang_arg`` (falling back to the first
+    language) in a fixed number of queries.
+
+    Raises About.DoesNotExist when the resolved language has no About.
+    """
+    about_items = about_queryset()
+    try:
+        about = about_items.get(lang__iso_code=lang_arg)
+    except About.DoesNotExist:
+        lang = Lang.objects.filter(iso_code=lang_arg).first() or Lang.objects.first()
+        try:
+            about = about_items.get(lang=lang)
+        except About.DoesNotExist:
+            raise _missing_about(lang, lang_arg)
+
+    return about_payload(
+        about,
+        journeys=about.professionaljourney_set.all(),
+        arsenals=about.technicalarsenal_set.all(),
+        core_values=about.corevalue_set.all(),
+        testimonials=about.testimonials_set.all(),
+        social_links=about_social_links_queryset(),
+    )
+
+
+async def abuild_about_payload(lang_arg=None):
+    """
+    Async ``build_about_payload``: once the About row is known, its sections
+    are loaded concurrently instead of one after another.
+    """
+    about_items = About.objects.select_related('lang')
+    try:
+        about = await about_items.aget(lang__iso_code=lang_arg)
+    except About.DoesNotExist:
+        lang = (await Lang.objects.filter(iso_code=lang_arg).afirst()
+                or await Lang.objects.afirst())
+        try:
+            about = await about_items.aget(lang=lang)
+        except About.DoesNotExist:
+            raise _missing_about(lang, lang_arg)
+
+    journeys, arsenals, core_values, testimonials, social_links = await gather_queries(
+        lambda: list(journeys_queryset().filter(about=about)),
+        lambda: list(arsenal_queryset().filter(about=about)),
+        lambda: list(core_values_queryset().filter(about=about)),
+        lambda: list(Testimonials.objects.filter(about=about)),
+        lambda: list(about_social_links_queryset()),
+    )
+    return about_payload(about, journeys=journeys, arsenals=arsenals,
+                         core_values=core_values, testimonials=testimonials,
+                         social_links=social_links)
+
+
+def about_payload(about, journeys, arsenals, core_values, testimonials, social_links):
+    """
+    Serialize an About row and its already loaded sections.
+    """
+    lang = about.lang
+    return {
+        'title': about.about_title,
+        'subtitle': about.sub_title,
+        'text': about.about_text,
+        'language': lang.name or "",
+        'image': about.image.url,
+        'image_srcset': about.image_srcset,
+        'image_title': about.image_title,
+        'professional_journal_title': about.professional_journal_title,
+        'professional_journal': [
+            {
+                'title': item.title,
+                'description': item.description,
+                'company': item.company,
+                'duration': item.duration
+            } for item in journeys
+        ],
+        'technical_arsenal_title': about.technical_arsenal_title,
+        'technical_arsenal': [
+            {
+                'icon': item.icon.class_name,
+                'title': item.title,
+                'skills': [
+                    skill.text for skill in item.technicalarsenalskill_set.all()
+                ]
+            } for item in arsenals
+        ],
+        'core_values_title': about.core_value_title,
+        'core_values': [
+            {
+                'title': value.title,
+                'icon': value.icon.class_name,
+                'description': value.description,
+            } for value in core_values
+        ],
+        'testimonials_title': about.testimonials_title,
+        'testimonials': [
+            {
+                'author': testimonial.author,
+                'position': testimonial.position,
+                'text': testimonial.text,
+            } for testimonial in testimonials
+        ],
+        'about_social_links': [
+            {
+                'icon': link.icon_class.class_name if link.icon_class else "",
+                'title': link.name,
+                'url': link.url
+            } for link in social_links
+        ]
+    }
+
+
+def contact_payload(contact, social_links, faq):
+    """
+    Serialize a Contact row with its social links and FAQ entries.
+    """
+    return {
+        'email': contact.email,
+        'business_email': contact.business_email,
+        'map_iframe_url': contact.map_iframe,
+        'phone': contact.phone,
+        'social_links': [
+            {
+                'platform': link.name,
+                'url': link.url,
+                'icon': link.icon_class.class_name,
+            } for link in social_links
+        ],
+        'FAQ': [
+            {
+                'question': element.question,
+                'answer': element.answer
+            } for element in faq
+        ]
+    }
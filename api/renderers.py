@@ -0,0 +1,67 @@
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND_ORJSON = 'orjson'
+JSON_BACKEND_STDLIB = 'json'
+
+
+def json_backend():
+    """
+    Encoder selected by ``JSON_BACKEND``; falls back to the standard library
+    when orjson is not installed.
+    """
+    if settings.JSON_BACKEND == JSON_BACKEND_ORJSON and orjson is not None:
+        return JSON_BACKEND_ORJSON
+    return JSON_BACKEND_STDLIB
+
+
+def dumps(data, encoder=DjangoJSONEncoder):
+    """
+    Serialize ``data`` to compact UTF-8 JSON bytes. Values orjson does not
+    handle natively (lazy translations, Decimal, ...) go through
+    ``encoder.default``.
+    """
+    if json_backend() == JSON_BACKEND_ORJSON:
+        return orjson.dumps(data, default=encoder().default,
+                            option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, cls=encoder, ensure_ascii=False,
+                      separators=(',', ':')).encode()
+
+
+class JsonResponse(HttpResponse):
+    """
+    Drop-in for ``django.http.JsonResponse`` that serializes through
+    ``dumps``.
+    """
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` serializing through ``dumps``. Indented output asked
+    for in the ``Accept`` header still goes through DRF's own encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data, self.encoder_class)
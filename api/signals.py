@@ -0,0 +1,29 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.cache import bump_model_version, is_versioned
+
+
+def bump_after_commit(model, using):
+    # A reader that picked up the new version before the commit would cache
+    # the old rows under it.
+    transaction.on_commit(partial(bump_model_version, model), using=using)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_version_on_write(sender, using, **kwargs):
+    if is_versioned(sender):
+        bump_after_commit(sender, using)
+
+
+@receiver(m2m_changed)
+def bump_version_on_m2m_change(sender, instance, action, model, using, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    for m in (type(instance), model):
+        if is_versioned(m):
+            bump_after_commit(m, using)
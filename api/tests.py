@@ -1,16 +1,49 @@
+import gzip
 import json
-from datetime import datetime
+import os
+import runpy
+import threading
+import time
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import patch
 
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.http import HttpResponse
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.test import (LiveServerTestCase, RequestFactory, TestCase, TransactionTestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework.test import APIClient, APITestCase, APIRequestFactory
 from rest_framework import status
 from api.models import *
-from api.views import CSRFTokenView, AboutPage, SkillCards, SocialLinksFooter
+from api import compression, renderers
+from api.cache import (LOCK_KEY, bump_model_version, get_model_versions, models_last_modified,
+                       shared_reads, single_flight)
+from api.payloads import build_about_payload
+from api.untils import gather_queries
+from SecCodeSmithBackend import routers
+from SecCodeSmithBackend.cache import AsyncRedisCacheClient
+from SecCodeSmithBackend.middleware import PIN_COOKIE, ReplicaPinningMiddleware
+from Images.jobs import claim_jobs
+from Images.models import ImageJob
+from Images.tests import TemporaryMediaMixin
+from api.views import (CSRFTokenView, AboutPage, AsyncAboutPage, AsyncContactPage,
+                       ContactPage, SkillCards, SocialLinksFooter)
 
 class SkillCardsViewTests(APITestCase):
     def setUp(self):
+        # Versions are bumped on commit, which a TestCase never reaches.
+        cache.clear()
         self.factory = APIRequestFactory()
         self.view = SkillCards.as_view()
         self.url = "/api/skills-cards"
@@ -75,8 +108,10 @@ class SkillCardsViewTests(APITestCase):
         self.assertEqual(returned_pairs, expected_pairs)
 
 
-class AboutPageViewTests(APITestCase):
+class AboutPageViewTests(TemporaryMediaMixin, APITestCase):
     def setUp(self):
+        # Versions are bumped on commit, which a TestCase never reaches.
+        cache.clear()
         self.factory = APIRequestFactory()
         self.view = AboutPage.as_view()
         self.url = "/api/about"
@@ -187,6 +222,7 @@ class AboutPageViewTests(APITestCase):
             "title",
             "subtitle",
             "image",
+            "image_srcset",
             "image_title",
             "text",
             "language",
@@ -242,8 +278,30 @@ class AboutPageViewTests(APITestCase):
             self.assertEqual(tst_item["text"], self.testimonial.text)
 
 
+    def test_about_payload_query_count_is_constant(self):
+        for i in range(5):
+            arsenal = TechnicalArsenal.objects.create(
+                icon=self.icon, title=f"Stack {i}", about=self.about
+            )
+            TechnicalArsenalSkill.objects.create(text=f"Skill {i}", technical_arsenal=arsenal)
+            CoreValue.objects.create(about=self.about, title=f"Value {i}",
+                                     icon=self.icon, description="Always")
+            SocialLinks.objects.create(name=f"Link {i}", url="https://example.com",
+                                       icon_class=self.icon, about_pages=True)
+
+        with self.assertNumQueries(7):
+            payload = build_about_payload(self.lang_en.iso_code)
+
+        self.assertEqual(len(payload["technical_arsenal"]), 6)
+        self.assertEqual(len(payload["core_values"]), 6)
+        self.assertEqual(len(payload["about_social_links"]), 5)
+        self.assertEqual(payload["technical_arsenal"][0]["skills"], [self.tech_skill.text])
+
+
 class FooterLinksViewTests(APITestCase):
     def setUp(self):
+        # Versions are bumped on commit, which a TestCase never reaches.
+        cache.clear()
         self.factory = APIRequestFactory()
         self.view = SocialLinksFooter.as_view()
         self.url = '/api/footer-links/'
@@ -287,6 +345,541 @@ class FooterLinksViewTests(APITestCase):
         self.assertEqual(payload[0]["url"], self.link_1.url)
 
 
+class VersionedCacheTests(APITestCase):
+    def setUp(self):
+        # Versions are bumped on commit, which a TestCase never reaches.
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.view = SocialLinksFooter.as_view()
+        self.url = '/api/footer-links/'
+        self.icon = IconsClass.objects.create(class_name="Github", name="Github")
+        self.link = SocialLinks.objects.create(
+            name="Github", url="https://www.github.com", icon_class=self.icon, footer=True,
+        )
+
+    def get_payload(self):
+        response = self.view(self.factory.get(self.url))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)
+
+    def test_cached_response_survives_unrelated_writes(self):
+        self.get_payload()
+        Lang.objects.create(name="Polish", iso_code="pl")
+        with self.assertNumQueries(0):
+            payload = self.get_payload()
+        self.assertEqual(payload[0]["url"], self.link.url)
+
+    def test_dependent_write_invalidates_cached_response(self):
+        self.get_payload()
+        self.link.url = "https://github.com/SecCodeSmith"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.link.save()
+        payload = self.get_payload()
+        self.assertEqual(payload[0]["url"], "https://github.com/SecCodeSmith")
+
+    def test_version_moves_when_the_write_commits(self):
+        self.get_payload()
+        before = get_model_versions([SocialLinks])
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.link.url = "https://github.com/SecCodeSmith"
+                self.link.save()
+                # A concurrent reader still sees the committed rows and must
+                # keep using, and caching under, the old version.
+                self.assertEqual(get_model_versions([SocialLinks]), before)
+        self.assertNotEqual(get_model_versions([SocialLinks]), before)
+        self.assertEqual(self.get_payload()[0]["url"], "https://github.com/SecCodeSmith")
+
+    def test_delete_invalidates_cached_response(self):
+        SocialLinks.objects.create(name="Mail", url="mailto:me@example.com",
+                                   icon_class=self.icon, footer=True)
+        self.assertEqual(len(self.get_payload()), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.link.delete()
+        self.assertEqual(len(self.get_payload()), 1)
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        # Versions are bumped on commit, which a TestCase never reaches.
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.view = SocialLinksFooter.as_view()
+        self.url = '/api/footer-links/'
+        self.icon = IconsClass.objects.create(class_name="Github", name="Github")
+        self.link = SocialLinks.objects.create(
+            name="Github", url="https://www.github.com", icon_class=self.icon, footer=True,
+        )
+
+    def test_response_carries_validators(self):
+        response = self.view(self.factory.get(self.url))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertEqual(response['Last-Modified'],
+                         http_date(int(self.link.updated_at.timestamp())))
+
+    def test_matching_etag_returns_304_without_queries(self):
+        etag = self.view(self.factory.get(self.url))['ETag']
+        with self.assertNumQueries(0):
+            response = self.view(self.factory.get(self.url, HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_if_modified_since_returns_304(self):
+        last_modified = self.view(self.factory.get(self.url))['Last-Modified']
+        response = self.view(self.factory.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified))
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_write_changes_etag(self):
+        etag = self.view(self.factory.get(self.url))['ETag']
+        self.link.url = "https://github.com/SecCodeSmith"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.link.save()
+        response = self.view(self.factory.get(self.url, HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_delete_moves_last_modified(self):
+        SocialLinks.objects.create(name="Mail", url="mailto:me@example.com",
+                                   icon_class=self.icon, footer=True)
+        before = self.view(self.factory.get(self.url))['Last-Modified']
+        time.sleep(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.link.delete()
+        response = self.view(self.factory.get(self.url, HTTP_IF_MODIFIED_SINCE=before))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class CompressedCacheTests(APITestCase):
+    def setUp(self):
+        # Versions are bumped on commit, which a TestCase never reaches.
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.view = SocialLinksFooter.as_view()
+        self.url = '/api/footer-links/'
+        icon = IconsClass.objects.create(class_name="Github", name="Github")
+        for i in range(10):
+            SocialLinks.objects.create(name=f"Link {i}", url=f"https://example.com/{i}",
+                                       icon_class=icon, footer=True)
+
+    def get(self, accept_encoding=None):
+        extra = {'HTTP_ACCEPT_ENCODING': accept_encoding} if accept_encoding else {}
+        response = self.view(self.factory.get(self.url, **extra))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_identity_body_without_accept_encoding(self):
+        response = self.get()
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(len(json.loads(response.content)), 10)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_gzip_variant(self):
+        identity = self.get().content
+        response = self.get('gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), identity)
+
+    def test_refused_coding_is_not_used(self):
+        response = self.get('gzip;q=0, identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    @skipUnless(compression.brotli, "brotli is not installed")
+    def test_brotli_preferred_when_accepted(self):
+        identity = self.get().content
+        response = self.get('gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), identity)
+
+    def test_body_is_compressed_once_per_version(self):
+        with patch('api.cache.compressed_variants',
+                   wraps=compression.compressed_variants) as compress:
+            for accept_encoding in (None, 'gzip', 'br', 'gzip'):
+                self.get(accept_encoding)
+            self.assertEqual(compress.call_count, 1)
+            with self.captureOnCommitCallbacks(execute=True):
+                SocialLinks.objects.first().delete()
+            self.get('gzip')
+            self.assertEqual(compress.call_count, 2)
+
+
+class JsonRenderingTests(TestCase):
+    payload = {'title': "Zażółć", 'count': 3, 'date': datetime(2025, 1, 2, 3, 4, 5),
+               'nested': [{'ok': True, 'none': None}]}
+
+    def expected(self):
+        return json.loads(json.dumps(self.payload, cls=DjangoJSONEncoder))
+
+    @skipUnless(renderers.orjson, "orjson is not installed")
+    def test_orjson_backend_matches_django_encoder(self):
+        self.assertEqual(renderers.json_backend(), renderers.JSON_BACKEND_ORJSON)
+        self.assertEqual(json.loads(renderers.dumps(self.payload)), self.expected())
+
+    @override_settings(JSON_BACKEND='json')
+    def test_stdlib_backend(self):
+        self.assertEqual(renderers.json_backend(), renderers.JSON_BACKEND_STDLIB)
+        self.assertEqual(json.loads(renderers.dumps(self.payload)), self.expected())
+
+    def test_json_response(self):
+        response = renderers.JsonResponse(self.payload, status=status.HTTP_201_CREATED)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(json.loads(response.content), self.expected())
+        with self.assertRaises(TypeError):
+            renderers.JsonResponse([1, 2])
+        self.assertEqual(json.loads(renderers.JsonResponse([1, 2], safe=False).content), [1, 2])
+
+    def test_renderer(self):
+        renderer = renderers.FastJSONRenderer()
+        self.assertEqual(json.loads(renderer.render(self.payload)), self.expected())
+        self.assertEqual(renderer.render(None), b'')
+        indented = renderer.render(self.payload, 'application/json; indent=2')
+        self.assertIn(b'\n  ', indented)
+
+    @skipUnless(renderers.orjson, "orjson is not installed")
+    def test_bench_json_command(self):
+        out = StringIO()
+        call_command('bench_json', posts=2, content_length=100, repeat=1, stdout=out)
+        self.assertIn("orjson", out.getvalue())
+
+
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        self.key = 'test:single-flight'
+        cache.delete_many([self.key, LOCK_KEY.format(self.key)])
+        self.calls = 0
+
+    def tearDown(self):
+        cache.delete_many([self.key, LOCK_KEY.format(self.key)])
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_fresh_entry_is_reused(self):
+        self.assertEqual(single_flight(self.key, self.compute), 1)
+        self.assertEqual(single_flight(self.key, self.compute), 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_entry_is_served_while_locked(self):
+        cache.set(self.key, {'value': 'stale', 'expires': time.time() - 1, 'delta': 0.1}, 60)
+        cache.add(LOCK_KEY.format(self.key), 1, 60)
+        self.assertEqual(single_flight(self.key, self.compute), 'stale')
+        self.assertEqual(self.calls, 0)
+
+    def test_stale_entry_is_rebuilt_by_lock_holder(self):
+        cache.set(self.key, {'value': 'stale', 'expires': time.time() - 1, 'delta': 0.1}, 60)
+        self.assertEqual(single_flight(self.key, self.compute), 1)
+        self.assertIsNone(cache.get(LOCK_KEY.format(self.key)))
+
+    @override_settings(PAGE_CACHE_LOCK_TIMEOUT=10)
+    def test_waiter_builds_at_once_when_nothing_cacheable_was_built(self):
+        locked = threading.Event()
+
+        def uncacheable():
+            # e.g. a 400 or 500 response, which versioned_cache does not store
+            locked.set()
+            time.sleep(0.2)
+            return None
+
+        holder = threading.Thread(target=single_flight, args=(self.key, uncacheable))
+        holder.start()
+        locked.wait()
+        started = time.monotonic()
+        self.assertEqual(single_flight(self.key, self.compute), 1)
+        holder.join()
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(self.calls, 1)
+
+    @override_settings(PAGE_CACHE_EARLY_REFRESH_BETA=1000.0)
+    def test_slow_entry_near_expiry_is_refreshed_early(self):
+        cache.set(self.key, {'value': 'old', 'expires': time.time() + 5, 'delta': 10.0}, 60)
+        self.assertEqual(single_flight(self.key, self.compute), 1)
+
+
+class AsyncRedisCacheTests(TestCase):
+    keys = ['test:async-a', 'test:async-b']
+
+    def setUp(self):
+        cache.delete_many(self.keys)
+
+    def tearDown(self):
+        cache.delete_many(self.keys)
+
+    async def test_async_calls_skip_the_sync_client(self):
+        with patch.object(AsyncRedisCacheClient, 'get_client',
+                          side_effect=AssertionError("sync client used")):
+            self.assertTrue(await cache.aadd('test:async-a', {'n': 1}, 60))
+            self.assertFalse(await cache.aadd('test:async-a', 2, 60))
+            await cache.aset('test:async-b', [1], 60)
+            self.assertEqual(await cache.aget_many(self.keys + ['test:async-c']),
+                             {'test:async-a': {'n': 1}, 'test:async-b': [1]})
+            self.assertTrue(await cache.adelete('test:async-a'))
+            self.assertEqual(await cache.aget('test:async-a', 'gone'), 'gone')
+        self.assertEqual(cache.get('test:async-b'), [1])
+
+    async def test_each_event_loop_gets_its_own_pool(self):
+        await cache.aset('test:async-a', 1, 60)
+        other_loop = await sync_to_async(async_to_sync(cache.aget), thread_sensitive=False)(
+            'test:async-a')
+        self.assertEqual(other_loop, 1)
+
+
+class WarmCacheCommandTests(TestCase):
+    def test_warm_cache_renders_public_routes(self):
+        icon = IconsClass.objects.create(name="Github", class_name="fab fa-github")
+        SocialLinks.objects.create(name="Github", url="https://www.github.com",
+                                   icon_class=icon, footer=True)
+        Lang.objects.create(name="English", iso_code="en")
+
+        out = StringIO()
+        call_command('warm_cache', pages=1, workers=1, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("/api/footer-links", output)
+        self.assertIn("/api/about/en/", output)
+        self.assertIn("0 failed", output)
+
+
+class AsyncReadViewTests(TransactionTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        lang = Lang.objects.create(name="English", iso_code="en")
+        icon = IconsClass.objects.create(name="Icon", class_name="fas fa-icon")
+        about = About.objects.create(about_title="About", about_text="Text", lang=lang,
+                                     image="about/about.webp")
+        ProfessionalJourney.objects.create(title="Developer", company="Acme",
+                                           start_date=datetime(2018, 1, 1),
+                                           description="APIs", about=about)
+        arsenal = TechnicalArsenal.objects.create(icon=icon, title="Python", about=about)
+        TechnicalArsenalSkill.objects.create(text="Django", technical_arsenal=arsenal)
+        CoreValue.objects.create(about=about, title="Integrity", icon=icon,
+                                 description="Always")
+        Testimonials.objects.create(author="Jane", email="jane@example.com",
+                                    position="CTO", text="Great", about=about)
+        contact = Contact.objects.create(email="me@example.com", business_email="b@example.com",
+                                         phone="+48123123123", map_iframe="https://maps",
+                                         language=lang)
+        FAQ.objects.create(question="Why?", answer="Because.", contact=contact)
+        SocialLinks.objects.create(name="Github", url="https://github.com", icon_class=icon,
+                                   about_pages=True, contact_pages=True)
+
+    async def test_gather_queries_runs_concurrently(self):
+        started = time.perf_counter()
+        results = await gather_queries(lambda: time.sleep(0.2) or 1,
+                                       lambda: time.sleep(0.2) or 2)
+        self.assertEqual(results, [1, 2])
+        self.assertLess(time.perf_counter() - started, 0.35)
+
+    async def test_async_views_match_sync_views(self):
+        for sync_view, async_view in ((AboutPage, AsyncAboutPage),
+                                      (ContactPage, AsyncContactPage)):
+            for lang_arg in ('en', 'xx'):
+                request = self.factory.get('/api/page/')
+                expected = await sync_to_async(sync_view.as_view())(request, lang_arg=lang_arg)
+                response = await async_view.as_view()(request, lang_arg=lang_arg)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(json.loads(response.content), json.loads(expected.content))
+
+    async def test_async_view_missing_contact_returns_404(self):
+        await Contact.objects.all().adelete()
+        response = await AsyncContactPage.as_view()(self.factory.get('/api/contact/'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_async_view_is_cached_and_conditional(self):
+        view = AsyncAboutPage.as_view()
+        first = await view(self.factory.get('/api/about/en/'), lang_arg='en')
+        response = await view(self.factory.get('/api/about/en/', HTTP_IF_NONE_MATCH=first['ETag']),
+                              lang_arg='en')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        await About.objects.filter(lang__iso_code='en').aupdate(about_title="Changed")
+        response = await view(self.factory.get('/api/about/en/'), lang_arg='en')
+        self.assertEqual(json.loads(response.content)['title'], "About")
+
+        about = await About.objects.aget(lang__iso_code='en')
+        about.about_title = "Changed"
+        await about.asave()
+        response = await view(self.factory.get('/api/about/en/'), lang_arg='en')
+        self.assertEqual(json.loads(response.content)['title'], "Changed")
+
+
+class BenchDbConnectionsCommandTests(TestCase):
+    def test_persistent_connection_is_reused(self):
+        out = StringIO()
+        call_command('bench_db_connections', requests=5, mode=['fresh', 'persistent'],
+                     stdout=out)
+        rows = {line.split()[0]: line.split()[-1] for line in out.getvalue().splitlines()[1:]}
+        # The in-memory test database is never really closed, so only the
+        # persistent mode has a predictable session count here.
+        self.assertEqual(set(rows), {'fresh', 'persistent'})
+        self.assertEqual(rows['persistent'], '1')
+
+
+class ServeModeTests(LiveServerTestCase):
+    # The server thread reads the test database through every alias.
+    databases = '__all__'
+
+    def test_gunicorn_config_follows_settings(self):
+        config = runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+        self.assertEqual(config['wsgi_app'], 'SecCodeSmithBackend.wsgi:application')
+        self.assertEqual(config['worker_class'], 'gthread')
+        self.assertEqual(config['max_requests'], settings.SERVER_MAX_REQUESTS)
+        self.assertTrue(config['preload_app'])
+        self.assertGreater(config['workers'], 0)
+
+    def test_bench_http_against_live_server(self):
+        out = StringIO()
+        call_command('bench_http', base_url=self.live_server_url, requests=10,
+                     concurrency=2, paths=[reverse('BlogApi:blog-tags')], stdout=out)
+        self.assertIn("10 requests", out.getvalue())
+        self.assertIn("responses: 200: 10", out.getvalue())
+
+
+class RendererSettingsTests(TestCase):
+    def renderers(self, browsable):
+        with patch.dict(os.environ, {'BROWSABLE_API': browsable}):
+            config = runpy.run_path(str(settings.BASE_DIR / 'SecCodeSmithBackend' / 'settings.py'))
+        return config['REST_FRAMEWORK']['DEFAULT_RENDERER_CLASSES']
+
+    def test_json_only_unless_browsable_api_is_enabled(self):
+        self.assertEqual(self.renderers('False'), ['api.renderers.FastJSONRenderer'])
+        self.assertIn('rest_framework.renderers.BrowsableAPIRenderer', self.renderers('True'))
+
+
+class ReplicaPinningMiddlewareTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def run_middleware(self, request, status_code=200, write=False):
+        seen = {}
+
+        def get_response(request):
+            seen['replica'] = routers._state.get().replica
+            if write:
+                routers.ReplicaRouter().db_for_write(Message)
+            return HttpResponse(status=status_code)
+
+        response = ReplicaPinningMiddleware(get_response)(request)
+        return seen['replica'], response
+
+    def test_public_get_may_use_replica(self):
+        replica, response = self.run_middleware(self.factory.get('/api/skills-cards'))
+        self.assertTrue(replica)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertIsNone(routers._state.get())
+
+    def test_writes_and_admin_use_primary(self):
+        replica, response = self.run_middleware(self.factory.post('/api/message/'))
+        self.assertFalse(replica)
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], settings.REPLICA_PIN_SECONDS)
+        replica, _ = self.run_middleware(self.factory.get(reverse('admin:index')))
+        self.assertFalse(replica)
+
+    def test_failed_post_does_not_pin(self):
+        _, response = self.run_middleware(self.factory.post('/api/message/'), status_code=400)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_write_during_get_pins_client(self):
+        _, response = self.run_middleware(self.factory.get('/api/skills-cards'), write=True)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_pinned_client_reads_primary_until_expiry(self):
+        request = self.factory.get('/api/skills-cards')
+        request.COOKIES[PIN_COOKIE] = str(time.time() + 5)
+        self.assertFalse(self.run_middleware(request)[0])
+        request.COOKIES[PIN_COOKIE] = str(time.time() - 1)
+        self.assertTrue(self.run_middleware(request)[0])
+        request.COOKIES[PIN_COOKIE] = 'garbage'
+        self.assertTrue(self.run_middleware(request)[0])
+
+
+class PrimaryReadsTests(TestCase):
+    def test_primary_reads_suspend_the_replica_for_the_block(self):
+        with routers.replica_reads() as state:
+            with routers.primary_reads():
+                self.assertFalse(routers.reads_replica())
+            self.assertTrue(routers.reads_replica())
+            with routers.primary_reads():
+                routers.ReplicaRouter().db_for_write(Message)
+            self.assertFalse(state.replica)
+
+    def test_shared_reads_use_primary_after_a_recent_change(self):
+        cache.clear()
+        with routers.replica_reads():
+            with shared_reads([IconsClass]):
+                self.assertTrue(routers.reads_replica())
+            bump_model_version(IconsClass)
+            with shared_reads([IconsClass]):
+                self.assertFalse(routers.reads_replica())
+            with shared_reads([Message]):
+                self.assertTrue(routers.reads_replica())
+
+
+@skipUnless('replica' in settings.DATABASES,
+            "set DATABASE_REPLICA_NAME (SQLite) or DATABASE_REPLICA_HOST to test replica routing")
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        self.client = APIClient()
+        icon = IconsClass.objects.create(class_name="fas fa-code")
+        SkillsCard.objects.create(category_title="Backend", icon_class=icon)
+        # Content the replica has long replayed.
+        settled = timezone.now() - timedelta(seconds=settings.REPLICA_MAX_LAG + 60)
+        for model in (IconsClass, SkillsCard):
+            model.objects.update(updated_at=settled)
+        cache.clear()
+        models_last_modified([SkillsCard, Skill, IconsClass])
+        routers.replica_health.reset()
+
+    def get_skill_cards(self):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(reverse('skills-cards'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(primary), len(replica)
+
+    def test_public_get_reads_from_replica(self):
+        primary, replica = self.get_skill_cards()
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_pinned_client_reads_from_primary(self):
+        self.client.cookies[PIN_COOKIE] = str(time.time() + 5)
+        primary, replica = self.get_skill_cards()
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_recently_changed_response_is_built_from_primary(self):
+        IconsClass.objects.create(class_name="fas fa-new")
+        primary, replica = self.get_skill_cards()
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_other_clients_write_keeps_reads_on_replica(self):
+        Message.objects.create(name="Jon", email="jon@example.pl", subject="Hi",
+                               project_type="Web", message="Hello")
+        primary, replica = self.get_skill_cards()
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_unrelated_write_keeps_reads_on_replica(self):
+        ImageJob.objects.create(model='Images.Image', object_id=1, source='images/a.png')
+        claim_jobs(5)
+        primary, replica = self.get_skill_cards()
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        with patch('SecCodeSmithBackend.routers.replica_lag', return_value=60):
+            primary, replica = self.get_skill_cards()
+        self.assertGreater(primary, 0)
+        # Only the health check itself touched the replica.
+        self.assertEqual(replica, 0)
+
+
 class APITests(TestCase):
 
     def setUp(self):
@@ -0,0 +1,30 @@
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+
+def _closing(query):
+    @wraps(query)
+    def run():
+        try:
+            return query()
+        finally:
+            # The worker thread keeps its own connection; release it the way
+            # the request cycle would (CONN_MAX_AGE decides).
+            close_old_connections()
+    return run
+
+
+async def gather_queries(*queries):
+    """
+    Run independent blocking ORM callables concurrently, each in a pooled
+    thread with its own database connection, and return their results in
+    order. Use it from async views for queries that do not depend on each
+    other.
+    """
+    return await asyncio.gather(*(
+        sync_to_async(_closing(query), thread_sensitive=False)()
+        for query in queries
+    ))
@@ -1,13 +1,19 @@
+from django.conf import settings
 from django.urls import path
 from api import views
 
+if settings.ASYNC_READ_VIEWS:
+    AboutPage, ContactPage = views.AsyncAboutPage, views.AsyncContactPage
+else:
+    AboutPage, ContactPage = views.AboutPage, views.ContactPage
+
 urlpatterns = [
    path('csrf', views.CSRFTokenView.as_view(), name='csrf'),
     path('skills-cards', views.SkillCards.as_view(), name='skills-cards'),
-    path('about/<str:lang>/', views.AboutPage.as_view(), name='about'),
-    path('about/', views.AboutPage.as_view(), name='about_default'),
+    path('about/<str:lang_arg>/', AboutPage.as_view(), name='about'),
+    path('about/', AboutPage.as_view(), name='about_default'),
     path('footer-links', views.SocialLinksFooter.as_view(), name='social-links-footer'),
-    path('contact/<str:lang_arg>', views.ContactPage.as_view(), name='contact'),
-    path('contact/', views.ContactPage.as_view(), name='contact_default'),
+    path('contact/<str:lang_arg>', ContactPage.as_view(), name='contact'),
+    path('contact/', ContactPage.as_view(), name='contact_default'),
     path('message/', views.ContactFormEndpoint.as_view(), name='contact'),
 ]
\ No newline at end of file
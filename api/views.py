@@ -1,13 +1,23 @@
 from sqlite3 import IntegrityError
 
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from django.http import JsonResponse
 from django.middleware.csrf import get_token
+from django.views import View
 from rest_framework import permissions, status
 from rest_framework.views import APIView
 
+from .cache import conditional, versioned_cache
 from .models import *
+from .payloads import (abuild_about_payload, build_about_payload, contact_payload,
+                       contact_social_links_queryset)
+from .renderers import JsonResponse
+from .untils import gather_queries
+
+# Models the about payload is built from.
+ABOUT_MODELS = (Lang, About, ProfessionalJourney, TechnicalArsenal,
+                TechnicalArsenalSkill, CoreValue, Testimonials, SocialLinks,
+                IconsClass)
+# Models the contact payload is built from.
+CONTACT_MODELS = (Lang, Contact, FAQ, SocialLinks, IconsClass)
 
 
 class CSRFTokenView(APIView):
@@ -23,7 +33,8 @@ class CSRFTokenView(APIView):
 class SkillCards(APIView):
     permission_classes = (permissions.AllowAny,)
 
-    @method_decorator(cache_page(60))
+    @conditional(SkillsCard, Skill, IconsClass)
+    @versioned_cache(SkillsCard, Skill, IconsClass)
     def get(self, request):
         """
         Returns a list of all available skills card.
@@ -51,87 +62,25 @@ class SkillCards(APIView):
 class AboutPage(APIView):
     permission_classes = (permissions.AllowAny,)
 
-    @method_decorator(cache_page(60))
+    @conditional(*ABOUT_MODELS)
+    @versioned_cache(*ABOUT_MODELS)
     def get(self, request, lang_arg = None):
         """
         Returns an About section of the website in specified language.
         """
 
         try:
-            lang = Lang.objects.get(iso_code=lang_arg)
-        except Lang.DoesNotExist:
-            lang = Lang.objects.first()
-
-        try:
-            about = About.objects.get(lang=lang)
-            professional_journey = (ProfessionalJourney.objects.filter(about=about)
-                                    .order_by('-end_date', '-start_date')
-                                    .all())
-            technical_arsenal = TechnicalArsenal.objects.filter(about=about).all()
-            core_value = CoreValue.objects.filter(about=about).all()
-            testimonials = Testimonials.objects.filter(about=about).all()
-        except About.DoesNotExist:
-            return JsonResponse({'error': 'About in lang {} not found'.format(lang.name or lang_arg)}
-                                , status=status.HTTP_404_NOT_FOUND)
-
-        data = {
-            'title': about.about_title,
-            'subtitle': about.sub_title,
-            'text': about.about_text,
-            'language': lang.name or "",
-            'image': about.image.url,
-            'image_title': about.image_title,
-            'professional_journal_title': about.professional_journal_title,
-            'professional_journal': [
-                {
-                    'title': item.title,
-                    'description': item.description,
-                    'company': item.company,
-                    'duration': item.duration
-                } for item in professional_journey
-            ],
-            'technical_arsenal_title': about.technical_arsenal_title,
-            'technical_arsenal': [
-                {
-                    'icon': item.icon.class_name,
-                    'title': item.title,
-                    'skills': [
-                       skill.text for skill in TechnicalArsenalSkill.objects.filter(technical_arsenal=item).all()
-                    ]
-                } for item in technical_arsenal
-            ],
-            'core_values_title': about.core_value_title,
-            'core_values': [
-                {
-                    'title': value.title,
-                    'icon': value.icon.class_name,
-                    'description': value.description,
-                } for value in core_value
-            ],
-            'testimonials_title': about.testimonials_title,
-            'testimonials': [
-                {
-                    'author': testimonial.author,
-                    'position': testimonial.position,
-                    'text': testimonial.text,
-                } for testimonial in testimonials
-            ],
-            'about_social_links': [
-                {
-                    'icon': link.icon_class.class_name,
-                    'title': link.name,
-                    'url': link.url
-                } for link in SocialLinks.objects
-                .filter(about_pages=True).all()
-            ]
-        }
+            data = build_about_payload(lang_arg)
+        except About.DoesNotExist as e:
+            return JsonResponse({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
 
         return JsonResponse(data, safe=False,status=status.HTTP_200_OK)
 
 class SocialLinksFooter(APIView):
     permission_classes = (permissions.AllowAny,)
 
-    @method_decorator(cache_page(60))
+    @conditional(SocialLinks, IconsClass)
+    @versioned_cache(SocialLinks, IconsClass)
     def get(self, request):
         socials = SocialLinks.objects.filter(footer=True).all()
 
@@ -150,7 +99,8 @@ class SocialLinksFooter(APIView):
 class ContactPage(APIView):
     permission_classes = (permissions.AllowAny,)
 
-    @method_decorator(cache_page(60))
+    @conditional(*CONTACT_MODELS)
+    @versioned_cache(*CONTACT_MODELS)
     def get(self, request, lang_arg = None):
         try:
             lang = Lang.objects.get(iso_code=lang_arg)
@@ -159,33 +109,54 @@ class ContactPage(APIView):
 
         try:
             contact = Contact.objects.get(language=lang)
-            socials = SocialLinks.objects.filter(contact_pages=True).all()
+            socials = contact_social_links_queryset()
             faq = FAQ.objects.filter(contact=contact).all()
 
-            data = {
-                'email': contact.email,
-                'business_email': contact.business_email,
-                'map_iframe_url': contact.map_iframe,
-                'phone': contact.phone,
-                'social_links': [
-                    {
-                        'platform': link.name,
-                        'url': link.url,
-                        'icon': link.icon_class.class_name,
-                    } for link in socials
-                ],
-                'FAQ': [
-                    {
-                        'question': element.question,
-                        'answer': element.answer
-                    } for element in faq
-                ]
-            }
+            data = contact_payload(contact, socials, faq)
 
             return JsonResponse(data, safe=False,status=status.HTTP_200_OK)
         except Contact.DoesNotExist:
             return JsonResponse({'error': 'Contact not found'}, status=status.HTTP_404_NOT_FOUND)
 
+class AsyncAboutPage(View):
+    """
+    ``AboutPage`` for ASGI: the About sections are loaded concurrently.
+    """
+
+    @conditional(*ABOUT_MODELS)
+    @versioned_cache(*ABOUT_MODELS)
+    async def get(self, request, lang_arg = None):
+        try:
+            data = await abuild_about_payload(lang_arg)
+        except About.DoesNotExist as e:
+            return JsonResponse({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+        return JsonResponse(data, safe=False,status=status.HTTP_200_OK)
+
+class AsyncContactPage(View):
+    """
+    ``ContactPage`` for ASGI: contact, social links and FAQ are loaded
+    concurrently once the language is known.
+    """
+
+    @conditional(*CONTACT_MODELS)
+    @versioned_cache(*CONTACT_MODELS)
+    async def get(self, request, lang_arg = None):
+        lang = (await Lang.objects.filter(iso_code=lang_arg).afirst()
+                or await Lang.objects.afirst())
+
+        try:
+            contact, socials, faq = await gather_queries(
+                lambda: Contact.objects.get(language=lang),
+                lambda: list(contact_social_links_queryset()),
+                lambda: list(FAQ.objects.filter(contact__language=lang)),
+            )
+        except Contact.DoesNotExist:
+            return JsonResponse({'error': 'Contact not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        data = contact_payload(contact, socials, faq)
+        return JsonResponse(data, safe=False,status=status.HTTP_200_OK)
+
 class ContactFormEndpoint(APIView):
     permission_classes = (permissions.AllowAny,)
     def post(self, request):
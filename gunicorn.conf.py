@@ -0,0 +1,56 @@
+"""
+Gunicorn configuration for serving SecCodeSmithBackend in production.
+
+    gunicorn -c gunicorn.conf.py
+
+Every value comes from the ``SERVER_*`` entries of the environ.Env config
+in ``SecCodeSmithBackend/settings.py``. Send SIGHUP to the master process
+to reload the code and replace workers gracefully.
+"""
+import multiprocessing
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SecCodeSmithBackend.settings')
+
+from SecCodeSmithBackend import settings  # noqa: E402
+
+APPLICATIONS = {
+    'wsgi': ('SecCodeSmithBackend.wsgi:application', 'sync'),
+    'asgi': ('SecCodeSmithBackend.asgi:application', 'uvicorn_worker.UvicornWorker'),
+}
+
+if settings.SERVER_INTERFACE not in APPLICATIONS:
+    raise ValueError(f"SERVER_INTERFACE must be one of {', '.join(APPLICATIONS)}")
+
+wsgi_app, worker_class = APPLICATIONS[settings.SERVER_INTERFACE]
+if worker_class == 'sync' and settings.SERVER_THREADS > 1:
+    worker_class = 'gthread'
+
+bind = settings.SERVER_BIND
+workers = settings.SERVER_WORKERS or multiprocessing.cpu_count() * 2 + 1
+threads = settings.SERVER_THREADS
+
+# Import Django once in the master so workers fork with it loaded.
+preload_app = settings.SERVER_PRELOAD
+
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+
+keepalive = settings.SERVER_KEEPALIVE
+timeout = settings.SERVER_TIMEOUT
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Connections opened while preloading must not be shared between workers.
+    from django.core.cache import caches
+    from django.db import connections
+
+    connections.close_all()
+    for connection in connections.all(initialized_only=True):
+        if hasattr(connection, 'close_pool'):
+            connection.close_pool()
+    caches.close_all()